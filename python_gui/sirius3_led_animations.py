@@ -1,9 +1,18 @@
-import threading
-import time
+import asyncio
 import logging
 from PySide6.QtCore import QObject, Signal
 from PySide6.QtGui import QColor
 
+# デフォルト色の定義（(r, g, b)タプル。QColorはGUI連携が必要な箇所のみ使用）
+COLOR_OFF = (0, 0, 0)         # 消灯
+COLOR_AMBER = (255, 191, 0)   # アンバー色（ウィンカー）
+COLOR_RED = (255, 0, 0)       # 赤（ブレーキ/緊急）
+COLOR_WHITE = (255, 255, 255) # 白（バックランプ）
+COLOR_BLUE = (0, 0, 255)      # 青（特殊用途）
+
+# モジュール共通のロガー（インスタンスごとにgetLoggerを呼ばない）
+logger = logging.getLogger("sirius3.animation")
+
 class AnimationSignals(QObject):
     """アニメーション状態を通知するためのシグナル"""
     animation_started = Signal(str)  # アニメーション開始時（アニメーション名）
@@ -12,29 +21,36 @@ class AnimationSignals(QObject):
 
 class LEDAnimation:
     """LEDアニメーションを管理するクラス"""
-    
+
+    # アニメーションタイプ → (メソッド名, 位置引数, デフォルトkwargs)
+    # if/elifの連鎖を辞書引きに置き換える（呼び出し側のkwargsが優先される）
+    _DISPATCH = {
+        "right_turn": ("_turn_signal_animation", ("RIGHT",), {}),
+        "left_turn": ("_turn_signal_animation", ("LEFT",), {}),
+        "lane_change_right": ("_turn_signal_animation", ("RIGHT",), {"cycles": 3}),  # 車線変更は3回点滅
+        "lane_change_left": ("_turn_signal_animation", ("LEFT",), {"cycles": 3}),
+        "hazard": ("_hazard_animation", (), {}),
+        "thank_you": ("_hazard_animation", (), {"cycles": 3}),  # サンキューハザードは3回点滅
+        "emergency": ("_emergency_animation", (), {}),
+        "forward": ("_move_animation", ("forward",), {}),
+        "reverse": ("_move_animation", ("reverse",), {}),
+    }
+
     def __init__(self, ble_controller):
         self.ble_controller = ble_controller
         self.running = False
         self.current_animation = None
-        self.stop_event = threading.Event()
-        self.signals = AnimationSignals()
-        self.logger = logging.getLogger("sirius3.animation")
-        
+        self._task = None  # 実行中アニメーションタスクのFuture
+        self._signals = None  # QObject生成コスト削減のため初回アクセス時に生成
+        self.logger = logger
+
         # デフォルトの色とタイミング設定
         self.default_speed = 0.5        # 標準スピード（秒）
         self.fast_speed = 0.25          # 速いスピード（秒）
         self.slow_speed = 0.8           # 遅いスピード（秒）
         self.default_cycles = 6         # デフォルトの繰り返し回数
         self.default_transition = 300   # デフォルト遷移時間（ミリ秒）
-        
-        # 色の定義
-        self.color_off = QColor(0, 0, 0)       # 消灯
-        self.color_amber = QColor(255, 191, 0)  # アンバー色（ウィンカー）
-        self.color_red = QColor(255, 0, 0)     # 赤（ブレーキ/緊急）
-        self.color_white = QColor(255, 255, 255) # 白（バックランプ）
-        self.color_blue = QColor(0, 0, 255)    # 青（特殊用途）
-        
+
         # アニメーション用のカスタム色設定（ユーザーが変更可能）
         self.custom_colors = {
             "left_turn": QColor(255, 191, 0),      # 左ウィンカー
@@ -47,179 +63,228 @@ class LEDAnimation:
             "forward": QColor(0, 0, 255),          # 前進
             "reverse": QColor(255, 255, 255)       # 後退
         }
-        
+
+        # ホットループ用に(r, g, b)タプルも並行して保持する
+        # （アニメーション中に毎回QColorのred()/green()/blue()を呼ばない）
+        self.custom_rgb = {key: (color.red(), color.green(), color.blue())
+                           for key, color in self.custom_colors.items()}
+
         # アニメーション後の色設定（新規追加）
         self.after_animation_color = QColor(0, 0, 0)  # デフォルトは消灯（黒）
         self.use_after_animation_color = False        # アニメーション後の色を使用するかどうか
-    
+
+    @property
+    def signals(self):
+        """アニメーション通知用シグナル（初回アクセス時に生成）
+
+        最初のアクセスはGUIスレッドでのシグナル接続時に行われるため、
+        QObjectはGUIスレッド上で生成される。
+        """
+        if self._signals is None:
+            self._signals = AnimationSignals()
+        return self._signals
+
     def set_custom_color(self, animation_type, color):
         """アニメーション用のカスタム色を設定する"""
         if animation_type in self.custom_colors:
             self.custom_colors[animation_type] = color
-            self.logger.debug(f"{animation_type}のカスタム色を設定: R={color.red()}, G={color.green()}, B={color.blue()}")
+            self.custom_rgb[animation_type] = (color.red(), color.green(), color.blue())
+            self.logger.debug("%sのカスタム色を設定: R=%d, G=%d, B=%d", animation_type, *self.custom_rgb[animation_type])
             return True
         return False
-    
+
     def get_custom_color(self, animation_type):
         """アニメーション用のカスタム色を取得する"""
         return self.custom_colors.get(animation_type)
-    
+
     def set_after_animation_color(self, color):
         """アニメーション後の色を設定する"""
         self.after_animation_color = color
-        self.logger.debug(f"アニメーション後の色を設定: R={color.red()}, G={color.green()}, B={color.blue()}")
-    
+        self.logger.debug("アニメーション後の色を設定: R=%d, G=%d, B=%d", color.red(), color.green(), color.blue())
+
     def get_after_animation_color(self):
         """アニメーション後の色を取得する"""
         return self.after_animation_color
-    
+
     def set_use_after_animation_color(self, use):
         """アニメーション後の色を使用するかどうかを設定する"""
         self.use_after_animation_color = use
         status = "有効" if use else "無効"
-        self.logger.debug(f"アニメーション後の色の使用: {status}")
-    
+        self.logger.debug("アニメーション後の色の使用: %s", status)
+
     def is_using_after_animation_color(self):
         """アニメーション後の色を使用するかどうかを取得する"""
         return self.use_after_animation_color
-    
+
     def start_animation(self, animation_type, **kwargs):
         """指定されたアニメーションを開始する"""
         # アニメーションがすでに実行中の場合は先に停止する
         if self.running:
-            self.logger.info(f"新しいアニメーション({animation_type})のため、実行中のアニメーションを停止します")
-            # 現在のアニメーション名を一時保存
-            previous_animation = self.current_animation
-            # 停止処理
-            self.stop_animation()
-            # 確実に停止処理が完了するまで少し待機
-            time.sleep(0.1)
-            # 停止していない場合は強制的にフラグをリセット
-            if self.running:
-                self.logger.warning("前のアニメーションの停止処理が完了していないため強制的に停止します")
-                self.running = False
-                self.stop_event.set()
-    
+            self.logger.info("新しいアニメーション(%s)のため、実行中のアニメーションを停止します", animation_type)
+            # タスクのキャンセルはループ上で新タスクの開始前に処理されるため、
+            # 待機を挟まずにそのまま新しいアニメーションを開始できる。
+            # 直後に新しいアニメーションが色を上書きするため、
+            # アニメーション後の色適用（BLE往復）は省略する
+            self.stop_animation(apply_after_color=False)
+
+        # アニメーションタイプに応じてコルーチンを作成（辞書でディスパッチ）
+        entry = self._DISPATCH.get(animation_type)
+        if entry is None:
+            self.logger.warning("未知のアニメーションタイプ: %s", animation_type)
+            return False
+
+        method_name, args, defaults = entry
+        coro = getattr(self, method_name)(*args, **{**defaults, **kwargs})
+
         # 新しいアニメーションの開始
         self.running = True
         self.current_animation = animation_type
-        self.stop_event.clear()
-        
+
         self.signals.animation_started.emit(animation_type)
         self.signals.status_message.emit(f"{animation_type}アニメーションを開始しました")
-        self.logger.info(f"アニメーション開始: {animation_type}")
-        
-        # アニメーションタイプに応じて処理を分岐
-        if animation_type == "right_turn":
-            threading.Thread(target=self._turn_signal_animation, 
-                          args=("RIGHT",), kwargs=kwargs, daemon=True).start()
-        
-        elif animation_type == "left_turn":
-            threading.Thread(target=self._turn_signal_animation, 
-                          args=("LEFT",), kwargs=kwargs, daemon=True).start()
-        
-        elif animation_type == "lane_change_right":
-            kwargs['cycles'] = kwargs.get('cycles', 3)  # 車線変更は3回点滅がデフォルト
-            threading.Thread(target=self._turn_signal_animation, 
-                          args=("RIGHT",), kwargs=kwargs, daemon=True).start()
-        
-        elif animation_type == "lane_change_left":
-            kwargs['cycles'] = kwargs.get('cycles', 3)  # 車線変更は3回点滅がデフォルト
-            threading.Thread(target=self._turn_signal_animation, 
-                          args=("LEFT",), kwargs=kwargs, daemon=True).start()
-        
-        elif animation_type == "hazard":
-            threading.Thread(target=self._hazard_animation, kwargs=kwargs, daemon=True).start()
-        
-        elif animation_type == "thank_you":
-            kwargs['cycles'] = kwargs.get('cycles', 3)  # サンキューハザードは3回点滅
-            threading.Thread(target=self._hazard_animation, kwargs=kwargs, daemon=True).start()
-        
-        elif animation_type == "emergency":
-            threading.Thread(target=self._emergency_animation, kwargs=kwargs, daemon=True).start()
-        
-        elif animation_type == "forward":
-            threading.Thread(target=self._move_animation, 
-                          args=("forward",), kwargs=kwargs, daemon=True).start()
-        
-        elif animation_type == "reverse":
-            threading.Thread(target=self._move_animation, 
-                          args=("reverse",), kwargs=kwargs, daemon=True).start()
-        
-        else:
-            self.logger.warning(f"未知のアニメーションタイプ: {animation_type}")
-            self.running = False
-            return False
-        
+        self.logger.info("アニメーション開始: %s", animation_type)
+
+        # BLE IOスレッドのイベントループ上でタスクとして実行する
+        # （アニメーションごとにスレッドを生成しない）
+        self._task = asyncio.run_coroutine_threadsafe(
+            coro, self.ble_controller.io_thread.loop)
+
         return True
-    
-    def stop_animation(self):
-        """実行中のアニメーションを停止する"""
+
+    def stop_animation(self, apply_after_color=True):
+        """実行中のアニメーションを停止する
+
+        Args:
+            apply_after_color: アニメーション後の色設定を適用するかどうか。
+                別のアニメーションへの切り替え時はFalseを指定し、
+                すぐに上書きされる色設定の送信を省略する。
+        """
         if not self.running:
             return
-            
-        self.stop_event.set()
+
+        # 実行中のタスクをキャンセル（await中でも即座に中断される）
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
         self.running = False
         self.logger.info("アニメーションを停止しました")
         self.signals.animation_stopped.emit()
         self.signals.status_message.emit("アニメーションを停止しました")
-        
+
+        if not apply_after_color:
+            return
+
         # すべてのデバイスにコマンドを送信するためにリストを作成
-        devices_to_update = []
-        for device_key in ["LEFT", "RIGHT"]:
-            if self.ble_controller.connected.get(device_key, False):
-                devices_to_update.append(device_key)
-        
+        # （接続状態はビットマスクから一度に取得する）
+        mask = self.ble_controller._connected_mask
+        devices_to_update = [device_key for device_key, bit
+                             in (("LEFT", 1), ("RIGHT", 2)) if mask & bit]
+
         if not devices_to_update:
             self.logger.warning("接続されているデバイスがありません。アニメーション後の色を設定できません。")
             return
-        
-        self.logger.info(f"アニメーション後の色設定を適用します。接続デバイス: {', '.join(devices_to_update)}")
-        
+
+        self.logger.info("アニメーション後の色設定を適用します。接続デバイス: %s", ", ".join(devices_to_update))
+
         # コマンドを複数のデバイスに同時に送信するための準備
         color_commands = []
         mode_commands = []
-        
+
         # アニメーション後の色設定に基づいてコマンドを準備
-        self.logger.debug(f"アニメーション後の色の使用設定: {self.use_after_animation_color}")
-        
+        self.logger.debug("アニメーション後の色の使用設定: %s", self.use_after_animation_color)
+
         if self.use_after_animation_color:
             # アニメーション後の色を使用する場合
             r, g, b = self.after_animation_color.red(), self.after_animation_color.green(), self.after_animation_color.blue()
-            self.logger.info(f"アニメーション後の色を適用: R={r}, G={g}, B={b}")
-            
+            self.logger.info("アニメーション後の色を適用: R=%d, G=%d, B=%d", r, g, b)
+
             # 各デバイスに適用するコマンドを追加
             for device_key in devices_to_update:
                 # まず色設定コマンドを用意
                 color_commands.append((device_key, "C", (r, g, b)))
+                self.ble_controller.device_idle[device_key] = False
                 # 次にモード設定コマンドを用意（固定色モード=0）
                 mode_commands.append((device_key, "M", 0))
         else:
             # 使用しない場合は消灯（黒だとArduino側で特別扱いされる可能性があるため非常に暗い色を使用）
             self.logger.info("アニメーション後の色を使用しないため消灯します")
             for device_key in devices_to_update:
-                # まず色設定コマンドを用意（非常に暗い色）
-                color_commands.append((device_key, "C", (1, 1, 1)))
-                # 次にモード設定コマンドを用意（固定色モード=0）
+                # 既に消灯アイドル状態のデバイスへの冗長な書き込みは省略する
+                if not self.ble_controller.device_idle.get(device_key, False):
+                    color_commands.append((device_key, "C", (1, 1, 1)))
+                    self.ble_controller.device_idle[device_key] = True
+                # モード設定コマンドを用意（固定色モード=0）
                 mode_commands.append((device_key, "M", 0))
-        
-        # まず色設定コマンドを送信
-        if color_commands:
-            self.logger.debug(f"色設定コマンドを送信: {color_commands}")
-            self.ble_controller._send_commands_simultaneously(color_commands)
-            # コマンド間に少し間隔を空ける
-            time.sleep(0.1)
-        
-        # 次にモード設定コマンドを送信
-        if mode_commands:
-            self.logger.debug(f"モード設定コマンドを送信: {mode_commands}")
-            self.ble_controller._send_commands_simultaneously(mode_commands)
-        
+
+        # 色設定→モード設定の順序を保ったまま一括送信する
+        # （従来はコマンド間に0.1秒のスリープを挟んでいた）
+        self.logger.debug("色・モード設定コマンドを送信: %s / %s", color_commands, mode_commands)
+        self.ble_controller._send_commands_pipelined([color_commands, mode_commands])
+
         self.logger.info("アニメーション後の設定適用完了")
-    
-    def _turn_signal_animation(self, side, speed=None, cycles=None, transition_time=None):
+
+    def _finish_animation(self, connected_devices):
+        """アニメーション終了時の共通処理（消灯して停止を通知する）"""
+        # 黒だとArduino側で特別扱いされる可能性があるため非常に暗い色で消灯する
+        # （既にアイドル状態のデバイスはスキップ）
+        commands = [(device_key, "C", (1, 1, 1)) for device_key in connected_devices
+                    if not self.ble_controller.device_idle.get(device_key, False)]
+        if commands:
+            self.ble_controller._send_commands_simultaneously(commands)
+            for device_key, _cmd_type, _value in commands:
+                self.ble_controller.device_idle[device_key] = True
+            self.logger.debug("アニメーション終了時にデバイスを消灯状態に設定")
+
+        self.running = False
+        self.signals.animation_stopped.emit()
+
+    async def _blink_frames(self, connected_devices, r, g, b, speed, cycles, transition_time):
+        """点滅ループの共通処理（ハザード/緊急アニメーションで共有）
+
+        指定色の点灯フレームと消灯フレームを交互に全デバイスへ一括送信する。
+        """
+        # 点灯/消灯ペイロードは毎フレーム同じなので、ループの外で一度だけエンコードする
+        # （各デバイスは同じ内容を受け取るためbytesオブジェクトを共有する）
+        on_payload = f"T:{r},{g},{b},{transition_time}".encode("ascii")
+        off_payload = f"T:0,0,0,{transition_time}".encode("ascii")
+        # フレームは不変なのでタプルに固めて毎フレーム使い回す
+        on_frame = tuple((device_key, on_payload) for device_key in connected_devices)
+        off_frame = tuple((device_key, off_payload) for device_key in connected_devices)
+
+        # 点滅フレームを送るためアイドル状態の記録を解除
+        for device_key in connected_devices:
+            self.ble_controller.device_idle[device_key] = False
+
+        # ループ内の属性チェーン解決を避けるため送信メソッドをローカルに束縛
+        send_raw_payloads = self.ble_controller.send_raw_payloads
+
+        # 送信レイテンシの累積で点滅周期が伸びないよう、単調クロックの
+        # デッドラインに合わせてフレームを刻む
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+
+        count = 0
+        while count < cycles:
+            # 点灯（1フレーム分を一括送信）
+            send_raw_payloads(on_frame)
+
+            # 点灯状態を保持
+            deadline += speed
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+            # 消灯（1フレーム分を一括送信）
+            send_raw_payloads(off_frame)
+
+            # 消灯状態を保持
+            deadline += speed
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+            count += 1
+
+    async def _turn_signal_animation(self, side, speed=None, cycles=None, transition_time=None):
         """ウィンカーアニメーション（右折/左折/車線変更）
-        
+
         Args:
             side: "LEFT" または "RIGHT"
             speed: 点滅の間隔（秒）
@@ -229,80 +294,90 @@ class LEDAnimation:
         speed = speed or self.default_speed
         cycles = cycles or self.default_cycles
         transition_time = transition_time or self.default_transition
-        
+
         # 点滅させるデバイス
         target_device = side
-        
-        # デバイスが接続されているか確認
-        if not self.ble_controller.connected.get(target_device, False):
-            self.logger.warning(f"{target_device}デバイスが接続されていません")
+        target_bit = 1 if side == "LEFT" else 2
+
+        # デバイスが接続されているか確認（ビットマスクを一度読むだけ）
+        mask = self.ble_controller._connected_mask
+        if not mask & target_bit:
+            self.logger.warning("%sデバイスが接続されていません", target_device)
             self.signals.status_message.emit(f"{target_device}デバイスが接続されていません")
             self.running = False
             return
-            
+
         try:
             # アニメーションタイプに合わせたカスタム色を取得
             animation_type = "left_turn" if side == "LEFT" else "right_turn"
             if self.current_animation:
                 animation_type = self.current_animation
-            
+
             # カスタム色がある場合はそれを使用、なければデフォルト
-            color = self.custom_colors.get(animation_type, self.color_amber)
-            r, g, b = color.red(), color.green(), color.blue()
-            
+            r, g, b = self.custom_rgb.get(animation_type, COLOR_AMBER)
+
             # 反対側のデバイスを特定
             opposite_device = "RIGHT" if side == "LEFT" else "LEFT"
-            opposite_connected = self.ble_controller.connected.get(opposite_device, False)
-            
+            opposite_connected = bool(mask & (target_bit ^ 3))
+
             # 反対側のデバイスが接続されている場合、消灯状態にする
-            if opposite_connected:
+            # （既にアイドル状態なら書き込みを省略）
+            if opposite_connected and not self.ble_controller.device_idle.get(opposite_device, False):
                 self.ble_controller.set_rgb_color(opposite_device, 1, 1, 1)  # 非常に暗い色で事実上消灯
                 self.ble_controller.set_mode(opposite_device, False)  # 固定色モードに設定
-                self.logger.debug(f"{opposite_device}デバイスを消灯状態に設定")
-            
+                self.ble_controller.device_idle[opposite_device] = True
+                self.logger.debug("%sデバイスを消灯状態に設定", opposite_device)
+
+            # 点滅フレームを送るためアイドル状態の記録を解除
+            self.ble_controller.device_idle[target_device] = False
+
+            # 点灯/消灯ペイロードは毎フレーム同じなので、ループの外で一度だけエンコードする
+            on_payload = f"T:{r},{g},{b},{transition_time}".encode("ascii")
+            off_payload = f"T:0,0,0,{transition_time}".encode("ascii")
+
+            # ループ内の属性チェーン解決を避けるため送信メソッドをローカルに束縛
+            queue_latest_payload = self.ble_controller.queue_latest_payload
+
+            # 送信レイテンシの累積で点滅周期が伸びないよう、単調クロックの
+            # デッドラインに合わせてフレームを刻む
+            loop = asyncio.get_running_loop()
+            deadline = loop.time()
+
             count = 0
-            while not self.stop_event.is_set() and count < cycles:
-                # 点灯
-                self.ble_controller.set_transition_color(
-                    target_device, r, g, b, transition_time)
-                
+            while count < cycles:
+                # 点灯（latest-wins送信。前の書き込みが残っていれば最新で上書きされる）
+                queue_latest_payload(target_device, on_payload)
+
                 # 点灯状態を保持
-                time.sleep(speed)
-                
-                if self.stop_event.is_set():
-                    break
-                
+                deadline += speed
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+
                 # 消灯
-                self.ble_controller.set_transition_color(
-                    target_device, 0, 0, 0, transition_time)
-                
+                queue_latest_payload(target_device, off_payload)
+
                 # 消灯状態を保持
-                time.sleep(speed)
-                
+                deadline += speed
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+
                 count += 1
-                
+
             # アニメーション終了、消灯状態に
-            if not self.stop_event.is_set():
-                # 両方のデバイスに対して消灯コマンドを送信
-                commands = []
-                for device_key in ["LEFT", "RIGHT"]:
-                    if self.ble_controller.connected.get(device_key, False):
-                        commands.append((device_key, "C", (1, 1, 1)))  # 非常に暗い色
-                
-                if commands:
-                    self.ble_controller._send_commands_simultaneously(commands)
-                    self.logger.debug("アニメーション終了時に両方のデバイスを消灯状態に設定")
-                
-                self.running = False
-                self.signals.animation_stopped.emit()
-                
+            # 接続状態はループ前に取得済みのものを使い、辞書を引き直さない
+            finish_devices = [target_device]
+            if opposite_connected:
+                finish_devices.append(opposite_device)
+            self._finish_animation(finish_devices)
+
+        except asyncio.CancelledError:
+            # stop_animationによるキャンセル。後処理はstop_animation側で行う
+            raise
         except Exception as e:
-            self.logger.error(f"ウィンカーアニメーション実行中にエラー: {str(e)}")
+            self.logger.error("ウィンカーアニメーション実行中にエラー: %s", str(e))
             self.running = False
-    
-    def _hazard_animation(self, speed=None, cycles=None, transition_time=None):
+
+    async def _hazard_animation(self, speed=None, cycles=None, transition_time=None):
         """ハザードランプアニメーション（両方同時点滅）
-        
+
         Args:
             speed: 点滅の間隔（秒）
             cycles: 点滅の回数
@@ -311,77 +386,44 @@ class LEDAnimation:
         speed = speed or self.default_speed
         cycles = cycles or self.default_cycles
         transition_time = transition_time or self.default_transition
-        
-        # 両方のデバイスが接続されているか確認
-        left_connected = self.ble_controller.connected.get("LEFT", False)
-        right_connected = self.ble_controller.connected.get("RIGHT", False)
-        
+
+        # 両方のデバイスが接続されているか確認（ビットマスクを一度読むだけ）
+        mask = self.ble_controller._connected_mask
+        left_connected = bool(mask & 1)
+        right_connected = bool(mask & 2)
+
         if not (left_connected or right_connected):
             self.logger.warning("デバイスが接続されていません")
             self.signals.status_message.emit("デバイスが接続されていません")
             self.running = False
             return
-            
+
+        # 接続済みデバイスのリストはここで一度だけ作り、以降は使い回す
+        connected_devices = [device_key for device_key, is_connected
+                             in (("LEFT", left_connected), ("RIGHT", right_connected))
+                             if is_connected]
+
         try:
             # カスタム色を取得（サンキューハザードかハザードか）
             animation_type = self.current_animation or "hazard"
-            color = self.custom_colors.get(animation_type, self.color_amber)
-            r, g, b = color.red(), color.green(), color.blue()
-            
-            count = 0
-            while not self.stop_event.is_set() and count < cycles:
-                # 両方点灯
-                commands = []
-                if left_connected:
-                    commands.append(("LEFT", "T", (r, g, b, transition_time)))
-                if right_connected:
-                    commands.append(("RIGHT", "T", (r, g, b, transition_time)))
-                
-                self.ble_controller._send_commands_simultaneously(commands)
-                
-                # 点灯状態を保持
-                time.sleep(speed)
-                
-                if self.stop_event.is_set():
-                    break
-                
-                # 両方消灯
-                commands = []
-                if left_connected:
-                    commands.append(("LEFT", "T", (0, 0, 0, transition_time)))
-                if right_connected:
-                    commands.append(("RIGHT", "T", (0, 0, 0, transition_time)))
-                
-                self.ble_controller._send_commands_simultaneously(commands)
-                
-                # 消灯状態を保持
-                time.sleep(speed)
-                
-                count += 1
-                
+            r, g, b = self.custom_rgb.get(animation_type, COLOR_AMBER)
+
+            # 共通の点滅ループで点灯/消灯フレームを刻む
+            await self._blink_frames(connected_devices, r, g, b, speed, cycles, transition_time)
+
             # アニメーション終了、消灯状態に
-            if not self.stop_event.is_set():
-                # 両方のデバイスに対して消灯コマンドを送信（元のコードと同様）
-                commands = []
-                if left_connected:
-                    commands.append(("LEFT", "C", (1, 1, 1)))  # 非常に暗い色
-                if right_connected:
-                    commands.append(("RIGHT", "C", (1, 1, 1)))  # 非常に暗い色
-                
-                if commands:
-                    self.ble_controller._send_commands_simultaneously(commands)
-                    self.logger.debug("アニメーション終了時に両方のデバイスを消灯状態に設定")
-                
-                self.running = False
-                self.signals.animation_stopped.emit()
-                
+            self._finish_animation(connected_devices)
+
+        except asyncio.CancelledError:
+            # stop_animationによるキャンセル。後処理はstop_animation側で行う
+            raise
         except Exception as e:
-            self.logger.error(f"ハザードアニメーション実行中にエラー: {str(e)}")
+            self.logger.error("ハザードアニメーション実行中にエラー: %s", str(e))
             self.running = False
-    
-    def _emergency_animation(self, speed=None, cycles=None, transition_time=None):
+
+    async def _emergency_animation(self, speed=None, cycles=None, transition_time=None):
         """緊急時アニメーション（赤色で速く点滅）
-        
+
         Args:
             speed: 点滅の間隔（秒）
             cycles: 点滅の回数
@@ -390,76 +432,43 @@ class LEDAnimation:
         speed = speed or self.fast_speed  # 緊急時は速い点滅
         cycles = cycles or self.default_cycles * 2  # 回数を多く
         transition_time = transition_time or int(self.default_transition / 2)  # 遷移も速く
-        
-        # 両方のデバイスが接続されているか確認
-        left_connected = self.ble_controller.connected.get("LEFT", False)
-        right_connected = self.ble_controller.connected.get("RIGHT", False)
-        
+
+        # 両方のデバイスが接続されているか確認（ビットマスクを一度読むだけ）
+        mask = self.ble_controller._connected_mask
+        left_connected = bool(mask & 1)
+        right_connected = bool(mask & 2)
+
         if not (left_connected or right_connected):
             self.logger.warning("デバイスが接続されていません")
             self.signals.status_message.emit("デバイスが接続されていません")
             self.running = False
             return
-            
+
+        # 接続済みデバイスのリストはここで一度だけ作り、以降は使い回す
+        connected_devices = [device_key for device_key, is_connected
+                             in (("LEFT", left_connected), ("RIGHT", right_connected))
+                             if is_connected]
+
         try:
             # カスタム色を取得
-            color = self.custom_colors.get("emergency", self.color_red)
-            r, g, b = color.red(), color.green(), color.blue()
-            
-            count = 0
-            while not self.stop_event.is_set() and count < cycles:
-                # 両方点灯
-                commands = []
-                if left_connected:
-                    commands.append(("LEFT", "T", (r, g, b, transition_time)))
-                if right_connected:
-                    commands.append(("RIGHT", "T", (r, g, b, transition_time)))
-                
-                self.ble_controller._send_commands_simultaneously(commands)
-                
-                # 点灯状態を保持
-                time.sleep(speed)
-                
-                if self.stop_event.is_set():
-                    break
-                
-                # 両方消灯
-                commands = []
-                if left_connected:
-                    commands.append(("LEFT", "T", (0, 0, 0, transition_time)))
-                if right_connected:
-                    commands.append(("RIGHT", "T", (0, 0, 0, transition_time)))
-                
-                self.ble_controller._send_commands_simultaneously(commands)
-                
-                # 消灯状態を保持
-                time.sleep(speed)
-                
-                count += 1
-                
+            r, g, b = self.custom_rgb.get("emergency", COLOR_RED)
+
+            # 共通の点滅ループで点灯/消灯フレームを刻む
+            await self._blink_frames(connected_devices, r, g, b, speed, cycles, transition_time)
+
             # アニメーション終了、消灯状態に
-            if not self.stop_event.is_set():
-                # 両方のデバイスに対して消灯コマンドを送信（元のコードと同様）
-                commands = []
-                if left_connected:
-                    commands.append(("LEFT", "C", (1, 1, 1)))  # 非常に暗い色
-                if right_connected:
-                    commands.append(("RIGHT", "C", (1, 1, 1)))  # 非常に暗い色
-                
-                if commands:
-                    self.ble_controller._send_commands_simultaneously(commands)
-                    self.logger.debug("アニメーション終了時に両方のデバイスを消灯状態に設定")
-                
-                self.running = False
-                self.signals.animation_stopped.emit()
-                
+            self._finish_animation(connected_devices)
+
+        except asyncio.CancelledError:
+            # stop_animationによるキャンセル。後処理はstop_animation側で行う
+            raise
         except Exception as e:
-            self.logger.error(f"緊急アニメーション実行中にエラー: {str(e)}")
+            self.logger.error("緊急アニメーション実行中にエラー: %s", str(e))
             self.running = False
-    
-    def _move_animation(self, direction, speed=None, transition_time=None):
+
+    async def _move_animation(self, direction, speed=None, transition_time=None):
         """移動アニメーション（発進/後退）
-        
+
         Args:
             direction: "forward" または "reverse"
             speed: アニメーションの速度（秒）
@@ -467,71 +476,64 @@ class LEDAnimation:
         """
         speed = speed or self.slow_speed
         transition_time = transition_time or self.default_transition
-        
-        # 両方のデバイスが接続されているか確認
-        left_connected = self.ble_controller.connected.get("LEFT", False)
-        right_connected = self.ble_controller.connected.get("RIGHT", False)
-        
+
+        # 両方のデバイスが接続されているか確認（ビットマスクを一度読むだけ）
+        mask = self.ble_controller._connected_mask
+        left_connected = bool(mask & 1)
+        right_connected = bool(mask & 2)
+
         if not (left_connected or right_connected):
             self.logger.warning("デバイスが接続されていません")
             self.signals.status_message.emit("デバイスが接続されていません")
             self.running = False
             return
-        
+
+        # 接続済みデバイスのリストはここで一度だけ作り、以降は使い回す
+        connected_devices = [device_key for device_key, is_connected
+                             in (("LEFT", left_connected), ("RIGHT", right_connected))
+                             if is_connected]
+
         try:
             # カスタム色を取得
-            animation_type = direction  # "forward" または "reverse"
             if direction == "forward":
-                color = self.custom_colors.get("forward", self.color_blue)
+                r, g, b = self.custom_rgb.get("forward", COLOR_BLUE)
             else:  # reverse
-                color = self.custom_colors.get("reverse", self.color_white)
-                
-            r, g, b = color.red(), color.green(), color.blue()
-            
+                r, g, b = self.custom_rgb.get("reverse", COLOR_WHITE)
+
+            # 送信レイテンシでフェード全体が間延びしないよう、単調クロックの
+            # デッドラインに合わせて待機する
+            loop = asyncio.get_running_loop()
+            deadline = loop.time()
+
+            # フェードフレームを送るためアイドル状態の記録を解除
+            for device_key in connected_devices:
+                self.ble_controller.device_idle[device_key] = False
+
             # 一回のアニメーション（フェードイン・フェードアウト）
             # フェードイン
-            commands = []
-            if left_connected:
-                commands.append(("LEFT", "T", (r, g, b, transition_time * 2)))
-            if right_connected:
-                commands.append(("RIGHT", "T", (r, g, b, transition_time * 2)))
-            
+            commands = [(device_key, "T", (r, g, b, transition_time * 2))
+                        for device_key in connected_devices]
             self.ble_controller._send_commands_simultaneously(commands)
-            
+
             # フェードイン待機
-            time.sleep(speed * 2)
-            
-            if self.stop_event.is_set():
-                return
-            
+            deadline += speed * 2
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+
             # フェードアウト
-            commands = []
-            if left_connected:
-                commands.append(("LEFT", "T", (0, 0, 0, transition_time * 3)))
-            if right_connected:
-                commands.append(("RIGHT", "T", (0, 0, 0, transition_time * 3)))
-            
+            commands = [(device_key, "T", (0, 0, 0, transition_time * 3))
+                        for device_key in connected_devices]
             self.ble_controller._send_commands_simultaneously(commands)
-            
+
             # フェードアウト待機
-            time.sleep(speed * 3)
-            
+            deadline += speed * 3
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+
             # アニメーション終了
-            if not self.stop_event.is_set():
-                # 両方のデバイスに対して消灯コマンドを送信
-                commands = []
-                if left_connected:
-                    commands.append(("LEFT", "C", (1, 1, 1)))  # 非常に暗い色
-                if right_connected:
-                    commands.append(("RIGHT", "C", (1, 1, 1)))  # 非常に暗い色
-                
-                if commands:
-                    self.ble_controller._send_commands_simultaneously(commands)
-                    self.logger.debug("アニメーション終了時に両方のデバイスを消灯状態に設定")
-                
-                self.running = False
-                self.signals.animation_stopped.emit()
-                
+            self._finish_animation(connected_devices)
+
+        except asyncio.CancelledError:
+            # stop_animationによるキャンセル。後処理はstop_animation側で行う
+            raise
         except Exception as e:
-            self.logger.error(f"移動アニメーション実行中にエラー: {str(e)}")
+            self.logger.error("移動アニメーション実行中にエラー: %s", str(e))
             self.running = False
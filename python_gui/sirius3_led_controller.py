@@ -2,15 +2,12 @@ import sys
 import time
 import asyncio
 import logging
-import queue
 import concurrent.futures
 from threading import Thread, Lock, Event
 from functools import partial
 from datetime import datetime
 import numpy as np
 import pyaudio
-import struct
-import colorsys
 from collections import deque
 
 from bleak import BleakScanner, BleakClient
@@ -21,7 +18,7 @@ from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                               QGroupBox, QCheckBox, QColorDialog, QMessageBox,
                               QTextEdit, QSplitter, QProgressBar, QRadioButton,
                               QButtonGroup, QGridLayout)
-from PySide6.QtCore import Qt, Signal, Slot, QObject, QTimer, QSize, QEvent
+from PySide6.QtCore import Qt, Signal, Slot, QObject, QTimer, QSize
 from PySide6.QtGui import QColor, QPainter, QBrush, QTextCursor, QFont, QIcon
 
 # シリウス3アニメーションをインポート
@@ -43,6 +40,26 @@ CMD_COLOR = "C"     # RGB色設定
 CMD_HUE = "H"       # 色相設定
 CMD_TRANSITION = "T" # 色遷移設定
 
+# 接続状態ビットマスク（LEFT=ビット0、RIGHT=ビット1）
+DEVICE_BITS = {"LEFT": 1, "RIGHT": 2}
+
+# スカラーコマンドのエンコード済みペイロード（import時に一度だけ生成）
+_HUE_LUT = tuple(f"{CMD_HUE}:{i}".encode("ascii") for i in range(256))
+_MODE_LUT = (f"{CMD_MODE}:0".encode("ascii"), f"{CMD_MODE}:1".encode("ascii"))
+
+
+def _encode_command(cmd_type, value):
+    """コマンドタイプと値からエンコード済みのペイロードを生成する"""
+    if cmd_type == CMD_COLOR:
+        return b"C:%d,%d,%d" % tuple(value)
+    if cmd_type == CMD_TRANSITION:
+        return b"T:%d,%d,%d,%d" % tuple(value)
+    if cmd_type == CMD_HUE:
+        return _HUE_LUT[value & 0xFF]
+    if cmd_type == CMD_MODE:
+        return _MODE_LUT[1 if value else 0]
+    return f"{cmd_type}:{value}".encode("ascii")
+
 # ロギング設定
 class QTextEditLogger(logging.Handler):
     """QTextEditにログを出力するためのハンドラー"""
@@ -65,63 +82,66 @@ class QTextEditLogger(logging.Handler):
             logging.ERROR: "red",
             logging.CRITICAL: "darkred"
         }
-    
+
+        # レコードごとにウィジェットを更新すると再描画が集中するため、
+        # バッファに溜めてタイマーでまとめて反映する（古い分は自動で破棄）
+        self._buf = deque(maxlen=500)
+        self._buf_lock = Lock()
+        self._timer = QTimer(widget)
+        self._timer.timeout.connect(self._flush)
+        self._timer.start(50)
+
     def emit(self, record):
         msg = self.format(record)
         color = self.level_colors.get(record.levelno, "white")
-        
-        # メインスレッドからの呼び出しを保証
-        QApplication.instance().postEvent(
-            self.widget,
-            LogUpdateEvent(f'<font color="{color}">{msg}</font><br>')
-        )
 
-# LogUpdateEventを追加
-class LogUpdateEvent(QEvent):
-    def __init__(self, html_text):
-        super().__init__(QEvent.Type(QEvent.User + 1))
-        self.html_text = html_text
+        # 整形のみ行い、ウィジェットへの反映はGUIスレッドのタイマーに任せる
+        with self._buf_lock:
+            self._buf.append(f'<font color="{color}">{msg}</font><br>')
+
+    def _flush(self):
+        """溜まったレコードを1回のカーソル操作でまとめて挿入する（GUIスレッド）"""
+        with self._buf_lock:
+            if not self._buf:
+                return
+            html = ''.join(self._buf)
+            self._buf.clear()
+
+        cursor = self.widget.textCursor()
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertHtml(html)
+        self.widget.setTextCursor(cursor)
+        # 自動スクロール
+        scrollbar = self.widget.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
 
-# ウィジェットにイベントハンドラを追加
+# ログ表示用ウィジェット
 class LogTextEdit(QTextEdit):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setReadOnly(True)
         self.setFont(QFont("Monospace", 9))
-        
-    def event(self, event):
-        if event.type() == QEvent.User + 1:
-            # LogUpdateEventからのテキスト更新
-            cursor = self.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            cursor.insertHtml(event.html_text)
-            self.setTextCursor(cursor)
-            # 自動スクロール
-            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
-            return True
-        return super().event(event)
-        
+
+
 # BLEコマンドキュー項目
 class BLECommand:
     """BLEデバイスに送信するコマンド"""
+    # オーディオ連動中は大量に生成されるため、インスタンス辞書を持たない
+    __slots__ = ("device_key", "cmd_type", "value", "callback", "timestamp", "payload")
+
     def __init__(self, device_key, cmd_type, value, callback=None):
         self.device_key = device_key
         self.cmd_type = cmd_type
         self.value = value
         self.callback = callback
         self.timestamp = time.time()
-        
+        # 送信ペイロードは生成時に一度だけエンコードする
+        self.payload = _encode_command(cmd_type, value)
+
     def get_command_string(self):
-        """コマンド文字列を返す"""
-        if self.cmd_type == CMD_COLOR:
-            r, g, b = self.value
-            return f"{self.cmd_type}:{r},{g},{b}"
-        elif self.cmd_type == CMD_TRANSITION:
-            r, g, b, duration = self.value
-            return f"{self.cmd_type}:{r},{g},{b},{duration}"
-        else:
-            return f"{self.cmd_type}:{self.value}"
-            
+        """コマンド文字列を返す（ログ表示用）"""
+        return self.payload.decode("ascii")
+
     def __str__(self):
         return f"BLECommand({self.device_key}, {self.get_command_string()})"
 
@@ -132,108 +152,37 @@ class BLESignals(QObject):
     log_message = Signal(int, str)  # level, message
     error_occurred = Signal(str)
 
-# ThreadPoolの代わりにシンプルなワーカースレッド実装を追加
-class AsyncWorker(Thread):
-    """非同期処理を実行するワーカースレッド"""
-    
-    def __init__(self, name="AsyncWorker"):
-        super().__init__(name=name, daemon=True)
-        self.queue = queue.Queue()
-        self.running = True
-        self.loop = None
-        # スレッド開始
-        self.start()
-    
-    def run(self):
-        """スレッドのメインループ"""
-        # 専用のイベントループを作成
-        self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
-        
-        while self.running:
-            try:
-                # キューからタスクを取得
-                task, future = self.queue.get(timeout=0.1)
-                
-                try:
-                    # asyncioタスクを実行
-                    result = self.loop.run_until_complete(task)
-                    # 結果を設定
-                    future.set_result(result)
-                except Exception as e:
-                    # エラーを設定
-                    future.set_exception(e)
-                    
-                self.queue.task_done()
-            except queue.Empty:
-                pass
-            except Exception as e:
-                print(f"AsyncWorker error: {str(e)}")
-                
-        # 終了時にループをクローズ
-        if self.loop and not self.loop.is_closed():
-            self.loop.close()
-    
-    def stop(self):
-        """ワーカーを停止"""
-        self.running = False
-        self.join(timeout=1.0)
-    
-    def run_coroutine(self, coro):
-        """コルーチンを実行して結果を返す"""
-        future = concurrent.futures.Future()
-        self.queue.put((coro, future))
-        return future
-
 # スレッド固有のイベントループを管理する簡易な機能
 class BLEIOThread(Thread):
     """BLE通信専用スレッド"""
-    
+
     def __init__(self):
         super().__init__(daemon=True, name="BLE-IO-Thread")
-        self.tasks = queue.Queue()
         self.loop = None
-        self.running = True
+        self._loop_ready = Event()
         self.start()
-    
+        # ループが利用可能になるまで待機
+        self._loop_ready.wait()
+
     def run(self):
         """スレッドのメインループ"""
+        # イベントループを常駐させ、コルーチンはrun_coroutine_threadsafeで受け付ける
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
-        
-        while self.running:
-            try:
-                # タスクを取得
-                coro, future = self.tasks.get(timeout=0.1)
-                
-                try:
-                    # コルーチンを実行
-                    result = self.loop.run_until_complete(coro)
-                    # 結果を設定
-                    future.set_result(result)
-                except Exception as e:
-                    # エラーを設定
-                    future.set_exception(e)
-                
-                self.tasks.task_done()
-            except queue.Empty:
-                pass
-            except Exception as e:
-                print(f"BLEIOThread error: {e}")
-        
+        self._loop_ready.set()
+        self.loop.run_forever()
+
         # 終了時の処理
-        if self.loop and not self.loop.is_closed():
+        if not self.loop.is_closed():
             self.loop.close()
-    
+
     def execute(self, coro):
-        """コルーチンを実行して結果を返す"""
-        future = concurrent.futures.Future()
-        self.tasks.put((coro, future))
-        return future
-    
+        """コルーチンをループに投入して結果のFutureを返す"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
     def stop(self):
         """スレッドを停止"""
-        self.running = False
+        self.loop.call_soon_threadsafe(self.loop.stop)
         self.join(timeout=1.0)
 
 class BLEController(QObject):
@@ -251,16 +200,30 @@ class BLEController(QObject):
             "LEFT": False,
             "RIGHT": False
         }
+        # 接続状態のビットマスク表現（アニメーションのホットパス用。
+        # connectedと同時に更新される）
+        self._connected_mask = 0
         self.device_addresses = {
             "LEFT": None,
             "RIGHT": None
         }
+        # 接続時に解決したキャラクタリスティック（毎回のUUID解決を回避）
+        self.characteristics = {
+            "LEFT": None,
+            "RIGHT": None
+        }
         
-        # スレッド管理
-        self.command_queue = queue.Queue()
+        # コマンドキュー（IOループ上のドレインコルーチンが消費する）
+        self._cmd_deque = deque()
+        self._cmd_scheduled = False  # ドレインコルーチンが投入済みかどうか
         self.queue_processing = False
-        self.stop_event = Event()
-        
+        # デバイスごとの最後に送信したRGB値（同一値の再送を省略する）
+        self._last_sent_color = {}
+        # 各デバイスが消灯アイドル状態（C:1,1,1）にあるかの記録。
+        # アニメーション側が冗長な消灯書き込みの省略に参照し、
+        # 点灯を伴う書き込みを行う送信パスで解除される
+        self.device_idle = {"LEFT": False, "RIGHT": False}
+
         # BLE IO専用スレッド
         self.io_thread = BLEIOThread()
         
@@ -274,130 +237,208 @@ class BLEController(QObject):
         # コマンド送信間隔（秒）
         self.command_interval = 0.1
 
+        # シグナル経由で通知するログの最低レベル
+        # （送信ホットパスのDEBUGログをクロススレッドemitの前で落とす）
+        self._log_level = logging.INFO
+
+        # latest-wins送信用の保留スロット（デバイスごとに未送信の最新ペイロードのみ保持）
+        self._pending_payloads = {"LEFT": None, "RIGHT": None}
+        self._payload_events = {}
+
         # オーディオ連動モード
         self.audio_mode = False
         self.audio_timer = None
         self.audio_transition_time = 100  # オーディオ遷移時間のデフォルト値(ms)
     
     def start_queue_processor(self):
-        """コマンドキュー処理スレッドを開始"""
-        if not self.queue_processing:
-            self.queue_processing = True
-            self.stop_event.clear()
-            Thread(target=self._process_command_queue, daemon=True, 
-                  name="CommandQueueProcessor").start()
-    
+        """コマンドキュー処理を有効化（ドレインはコマンド投入時に自動起動する）"""
+        self.queue_processing = True
+
     def stop_queue_processor(self):
-        """コマンドキュー処理スレッドを停止"""
-        self.stop_event.set()
+        """コマンドキュー処理を停止し、未送信のコマンドを破棄する"""
         self.queue_processing = False
-    
+        self._cmd_deque.clear()
+
+    def _mark_device_lit(self, device_key, cmd_type, value):
+        """点灯を伴うコマンドで消灯アイドル記録を解除する
+
+        (1,1,1)/(0,0,0)への色・遷移は消灯扱いなので記録を保つ。
+        """
+        if cmd_type in (CMD_COLOR, CMD_TRANSITION):
+            if max(value[0], value[1], value[2]) > 1:
+                self.device_idle[device_key] = False
+        elif cmd_type == CMD_HUE or (cmd_type == CMD_MODE and value == 1):
+            self.device_idle[device_key] = False
+
+    def set_log_level(self, level):
+        """シグナル経由で通知するログの最低レベルを設定"""
+        self._log_level = level
+
     def _log(self, level, message):
-        """ログメッセージを発行"""
+        """ログメッセージを発行（閾値未満はシグナルを出さずに捨てる）"""
+        if level < self._log_level:
+            return
         self.signals.log_message.emit(level, message)
-        
-    def _process_command_queue(self):
-        """コマンドキューを処理するスレッド関数"""
-        self._log(logging.INFO, "コマンドキュー処理を開始しました")
-        
-        while not self.stop_event.is_set():
-            try:
-                # キューからコマンドを取得（タイムアウト付き）
+
+    async def _drain_command_queue(self):
+        """キューに溜まったコマンドをIOループ上で順に送信するコルーチン
+
+        enqueue_commandが必要なときに1つだけ投入する。キューが空になったら
+        終了し、次のコマンド投入時に再スケジュールされる。
+        """
+        while True:
+            # 溜まっているコマンドをまとめて取り出す
+            batch = []
+            while True:
                 try:
-                    command = self.command_queue.get(timeout=0.5)
-                except queue.Empty:
-                    continue
-                
-                # コマンドの処理
-                device_key = command.device_key
-                
-                # 対象デバイスの接続状態をチェック
-                if not self.connected.get(device_key, False):
-                    self._log(logging.WARNING, f"{device_key}デバイスは接続されていません。コマンドをスキップします: {command}")
-                    if command.callback:
-                        command.callback(False)
-                    self.command_queue.task_done()
-                    continue
-                
-                # コマンドの処理
-                if self.audio_mode and command.cmd_type == CMD_COLOR:
-                    # オーディオ連動モードの場合、色設定コマンドは無視
-                    self.command_queue.task_done()
-                    continue
-                
-                # BLEコマンドを実行
-                success = self._execute_ble_command(command)
-                
-                # コールバックがあれば呼び出し
-                if command.callback:
-                    command.callback(success)
-                
-                self.command_queue.task_done()
-                
-                # 連続送信による過負荷を防ぐための短いスリープ
-                time.sleep(self.command_interval)  # 設定可能な間隔を使用
-                
-            except Exception as e:
-                self._log(logging.ERROR, f"コマンドキュー処理中にエラーが発生しました: {str(e)}")
+                    batch.append(self._cmd_deque.popleft())
+                except IndexError:
+                    break
+
+            if not batch:
+                # 取り尽くした。フラグの解除と残量チェックをロック内で行い、
+                # enqueue側との競合でコマンドを取りこぼさないようにする
+                with self.lock:
+                    if not self._cmd_deque:
+                        self._cmd_scheduled = False
+                        return
                 continue
-                
-        self._log(logging.INFO, "コマンドキュー処理を終了しました")
-    
-    def _execute_ble_command(self, command):
-        """BLEコマンドを実行"""
-        device_key = command.device_key
-        command_str = command.get_command_string()
-        
-        try:
-            # デバイス取得（スレッドセーフに）
-            client = None
-            with self.lock:
-                client = self.clients.get(device_key)
-                if not client or not self.connected.get(device_key, False):
-                    self._log(logging.WARNING, f"{device_key}デバイスは接続されていません")
-                    return False
-            
-            # 送信処理
-            async def send_command():
+
+            commands = self._coalesce_commands(batch)
+
+            # 別デバイス宛の同種コマンドが並んでいる場合は1回のイベント
+            # ループ反復でまとめて書き込む（LEFT/RIGHT同色更新の定型パターン）
+            i = 0
+            while i < len(commands):
+                group = [commands[i]]
+                seen_devices = {commands[i].device_key}
+                j = i + 1
+                while (j < len(commands)
+                       and commands[j].cmd_type == commands[i].cmd_type
+                       and commands[j].device_key not in seen_devices):
+                    seen_devices.add(commands[j].device_key)
+                    group.append(commands[j])
+                    j += 1
+                i = j
+
                 try:
-                    self._log(logging.DEBUG, f"{device_key}デバイスにコマンド送信開始: {command_str}")
-                    await client.write_gatt_char(CHARACTERISTIC_UUID, command_str.encode())
-                    self._log(logging.DEBUG, f"{device_key}デバイスにコマンド送信完了: {command_str}")
-                    return True
+                    if len(group) == 1:
+                        await self._process_queued_command(group[0])
+                    else:
+                        await asyncio.gather(
+                            *(self._process_queued_command(c) for c in group),
+                            return_exceptions=True)
                 except Exception as e:
-                    self._log(logging.ERROR, f"{device_key}デバイスへのコマンド送信エラー: {str(e)}")
-                    return False
-            
-            # IO専用スレッドで実行
-            future = self.io_thread.execute(send_command())
-            
-            try:
-                # タイムアウト付きで結果を待機
-                result = future.result(timeout=self.command_timeout)
-                
-                if result:
-                    self._log(logging.INFO, f"{device_key}デバイスにコマンド送信: {command_str}")
-                    self.signals.command_status.emit(device_key, True, f"コマンド送信成功: {command_str}")
-                    return True
-                else:
-                    self.signals.command_status.emit(device_key, False, f"コマンド送信失敗: {command_str}")
-                    return False
-            except concurrent.futures.TimeoutError:
-                self._log(logging.ERROR, f"{device_key}デバイスへのコマンド送信がタイムアウトしました: {command_str}")
-                self.signals.command_status.emit(device_key, False, f"コマンド送信タイムアウト: {command_str}")
-                self._update_connection_status(device_key, False)
-                return False
-        except Exception as e:
-            self._log(logging.ERROR, f"{device_key}デバイスへのコマンド送信に失敗: {str(e)}")
-            self.signals.command_status.emit(device_key, False, f"コマンド送信エラー: {str(e)}")
-            return False
-    
+                    self._log(logging.ERROR, f"コマンドキュー処理中にエラーが発生しました: {str(e)}")
+
+    def _coalesce_commands(self, batch):
+        """バッチ内の色・色相コマンドをデバイスごとに最新のみへ圧縮する
+
+        BLE書き込みより速いペースで届いた更新は最後の値だけが意味を
+        持つため、古いコマンドは送信せずコールバックのみ成功で解決する。
+        モード変更をまたいだ合成は行わず、コマンドの順序は保たれる。
+        """
+        if len(batch) == 1:
+            return batch
+
+        coalesced = []
+        latest = {}  # (device_key, cmd_type) -> coalesced内のインデックス
+
+        def supersede(key):
+            index = latest.pop(key, None)
+            if index is not None:
+                old_command = coalesced[index]
+                coalesced[index] = None
+                if old_command.callback:
+                    old_command.callback(True)
+
+        for command in batch:
+            if command.cmd_type in (CMD_COLOR, CMD_HUE):
+                key = (command.device_key, command.cmd_type)
+                supersede(key)
+                latest[key] = len(coalesced)
+            elif command.cmd_type == CMD_MODE:
+                # 自動色相モードへの切り替えで保留中の色設定は無意味になる
+                if command.value == 1:
+                    supersede((command.device_key, CMD_COLOR))
+                latest.pop((command.device_key, CMD_COLOR), None)
+                latest.pop((command.device_key, CMD_HUE), None)
+            coalesced.append(command)
+
+        return [command for command in coalesced if command is not None]
+
+    async def _process_queued_command(self, command):
+        """キューから取り出したコマンドを1件処理する"""
+        device_key = command.device_key
+
+        # 対象デバイスの接続状態をチェック
+        # （clients/connectedの更新は全てIOループ上で行われるため、
+        # 　同じループ上で動く本コルーチンからの読み取りにロックは不要）
+        client = self.clients.get(device_key)
+        is_connected = self.connected.get(device_key, False)
+
+        if not client or not is_connected:
+            self._log(logging.WARNING, f"{device_key}デバイスは接続されていません。コマンドをスキップします: {command}")
+            if command.callback:
+                command.callback(False)
+            return
+
+        # 遷移・色相・モード変更はデバイス側の表示色を変えるため、
+        # 直前に送った色のキャッシュを無効化する
+        if command.cmd_type in (CMD_TRANSITION, CMD_HUE, CMD_MODE):
+            self._last_sent_color.pop(device_key, None)
+
+        # 点灯を伴うコマンドなら消灯アイドル記録も解除する
+        self._mark_device_lit(device_key, command.cmd_type, command.value)
+
+        # 直前に送った色と同じなら書き込みを省略する
+        # （オーディオ連動では低音量時に同一のRGBが連続しやすい）
+        if command.cmd_type == CMD_COLOR:
+            if self._last_sent_color.get(device_key) == command.value:
+                if command.callback:
+                    command.callback(True)
+                return
+
+        # BLEコマンドを実行（生成時にエンコード済みのペイロードをそのまま送信）
+        success = await self._async_send_command(device_key, client, command.payload)
+
+        command_str = command.get_command_string()
+
+        if success:
+            if command.cmd_type == CMD_COLOR:
+                self._last_sent_color[device_key] = command.value
+            self._log(logging.INFO, f"{device_key}デバイスにコマンド送信: {command_str}")
+            self.signals.command_status.emit(device_key, True, f"コマンド送信成功: {command_str}")
+        else:
+            self.signals.command_status.emit(device_key, False, f"コマンド送信失敗: {command_str}")
+
+        # コールバックがあれば呼び出し
+        if command.callback:
+            command.callback(success)
+
+        # 連続送信による過負荷を防ぐための短い間隔（後続がある場合のみ待つ）
+        if self._cmd_deque and self.command_interval > 0:
+            await asyncio.sleep(self.command_interval)
+
+
     def _update_connection_status(self, device_key, connected):
         """接続状態を更新"""
         with self.lock:
             self.connected[device_key] = connected
+            if connected:
+                self._connected_mask |= DEVICE_BITS.get(device_key, 0)
+            else:
+                self._connected_mask &= ~DEVICE_BITS.get(device_key, 0)
             self.signals.connection_status.emit(device_key, connected)
-    
+
+    def is_any_connected(self):
+        """いずれかのデバイスが接続済みかをビットマスクで判定"""
+        return self._connected_mask != 0
+
+    def are_both_connected(self):
+        """LEFT/RIGHTの両方が接続済みかをビットマスクで判定"""
+        return self._connected_mask == (DEVICE_BITS["LEFT"] | DEVICE_BITS["RIGHT"])
+
     def scan_and_connect(self, device_key):
         """デバイスをスキャンして接続"""
         device_name = DEVICE_NAMES.get(device_key)
@@ -406,13 +447,13 @@ class BLEController(QObject):
             return False
         
         self._log(logging.INFO, f"{device_key} ({device_name})デバイスを探しています...")
-        future = concurrent.futures.Future()
-        
+
         # 接続処理
         async def scan_and_connect_async():
             try:
-                # デバイススキャン
-                devices = await BleakScanner.discover(timeout=2.0)
+                # デバイススキャン（サービスUUIDで絞り込み）
+                devices = await BleakScanner.discover(
+                    timeout=2.0, service_uuids=[SERVICE_UUID])
                 
                 target_device = None
                 for device in devices:
@@ -424,106 +465,140 @@ class BLEController(QObject):
                 if not target_device:
                     self._log(logging.WARNING, f"{device_key}デバイスが見つかりませんでした")
                     return False
-                
-                # アドレスを保存
-                self.device_addresses[device_key] = target_device.address
-                
-                # 接続
-                client = BleakClient(target_device.address)
-                # await client.connect()
-                await client.connect(timeout=2.0, services=[SERVICE_UUID])
-                
-                if client.is_connected:
-                    with self.lock:
-                        self.clients[device_key] = client
-                        self.connected[device_key] = True
-                    
-                    self._log(logging.INFO, f"{device_key}デバイスに接続しました")
-                    self._update_connection_status(device_key, True)
-                    return True
-                else:
-                    self._log(logging.WARNING, f"{device_key}デバイスに接続できませんでした")
-                    return False
+
+                return await self._connect_found_device(device_key, target_device)
             except Exception as e:
                 self._log(logging.ERROR, f"{device_key}デバイスへの接続中にエラーが発生: {str(e)}")
+                self._update_connection_status(device_key, False)
                 return False
-        
-        # IO専用スレッドで実行
-        io_future = self.io_thread.execute(scan_and_connect_async())
-        
-        # 完了コールバック
-        def on_done(f):
+
+        # IO専用スレッドで実行（run_coroutine_threadsafeのFutureをそのまま返す）
+        return self.io_thread.execute(scan_and_connect_async())
+
+    async def _connect_found_device(self, device_key, target_device):
+        """発見済みデバイスへ接続して状態を登録する（IOスレッド上で実行）"""
+        try:
+            # アドレスを保存
+            self.device_addresses[device_key] = target_device.address
+
+            # 接続
+            client = BleakClient(target_device.address)
+            await client.connect(timeout=2.0, services=[SERVICE_UUID])
+
+            if client.is_connected:
+                with self.lock:
+                    self.clients[device_key] = client
+                    self.connected[device_key] = True
+                    self._connected_mask |= DEVICE_BITS.get(device_key, 0)
+                    # キャラクタリスティックを一度だけ解決してキャッシュ
+                    self.characteristics[device_key] = \
+                        client.services.get_characteristic(CHARACTERISTIC_UUID)
+
+                self._log(logging.INFO, f"{device_key}デバイスに接続しました")
+                self._update_connection_status(device_key, True)
+                return True
+            else:
+                self._log(logging.WARNING, f"{device_key}デバイスに接続できませんでした")
+                return False
+        except Exception as e:
+            self._log(logging.ERROR, f"{device_key}デバイスへの接続中にエラーが発生: {str(e)}")
+            self._update_connection_status(device_key, False)
+            return False
+
+    def connect_both(self, device_keys=("LEFT", "RIGHT")):
+        """1回のスキャンで複数デバイスを発見し、並行して接続する
+
+        デバイスごとにscan_and_connectを呼ぶとスキャンが台数分直列に走るため、
+        両耳接続ではこちらを使う。結果は {device_key: 接続成否} のFuture。
+        """
+        targets = {key: DEVICE_NAMES[key] for key in device_keys if key in DEVICE_NAMES}
+
+        async def connect_both_async():
+            results = {key: False for key in targets}
             try:
-                result = f.result()
-                future.set_result(result)
+                self._log(logging.INFO,
+                          f"デバイスを探しています: {', '.join(targets.values())}")
+                # デバイススキャン（サービスUUIDで絞り込み、1回で全対象を発見）
+                devices = await BleakScanner.discover(
+                    timeout=2.0, service_uuids=[SERVICE_UUID])
+
+                name_to_key = {name: key for key, name in targets.items()}
+                found = {}
+                for device in devices:
+                    key = name_to_key.get(device.name)
+                    if key and key not in found:
+                        self._log(logging.INFO, f"デバイスが見つかりました: {device.name} ({device.address})")
+                        found[key] = device
+
+                for key in targets:
+                    if key not in found:
+                        self._log(logging.WARNING, f"{key}デバイスが見つかりませんでした")
+
+                if found:
+                    # 見つかったデバイスへ並行して接続
+                    outcomes = await asyncio.gather(
+                        *(self._connect_found_device(key, device)
+                          for key, device in found.items()))
+                    results.update(zip(found.keys(), outcomes))
             except Exception as e:
-                self._log(logging.ERROR, f"接続処理中にエラーが発生: {str(e)}")
-                self._update_connection_status(device_key, False)
-                future.set_exception(e)
-        
-        io_future.add_done_callback(on_done)
-        return future
-    
+                self._log(logging.ERROR, f"同時接続中にエラーが発生: {str(e)}")
+            return results
+
+        return self.io_thread.execute(connect_both_async())
+
     def disconnect(self, device_key):
         """デバイスを切断"""
-        future = concurrent.futures.Future()
-        
         with self.lock:
             if not self.clients.get(device_key) or not self.connected.get(device_key, False):
                 self._log(logging.WARNING, f"{device_key}デバイスは接続されていません")
+                future = concurrent.futures.Future()
                 future.set_result(False)
                 return future
-        
+
         client = self.clients.get(device_key)
-        
+
         # 切断処理
         async def disconnect_async():
             try:
                 await client.disconnect()
-                return True
+                result = True
             except Exception as e:
                 self._log(logging.ERROR, f"{device_key}デバイスの切断中にエラーが発生: {str(e)}")
-                return False
-        
-        # IO専用スレッドで実行
-        io_future = self.io_thread.execute(disconnect_async())
-        
-        # 完了コールバック
-        def on_done(f):
-            try:
-                result = f.result()
-                
-                # 接続状態を更新
-                with self.lock:
-                    self.clients[device_key] = None
-                    self.connected[device_key] = False
-                
-                self._log(logging.INFO, f"{device_key}デバイスを切断しました")
-                self._update_connection_status(device_key, False)
-                future.set_result(result)
-            except Exception as e:
-                self._log(logging.ERROR, f"{device_key}デバイスの切断処理でエラー: {str(e)}")
-                
-                # エラーが発生しても接続状態をリセット
-                with self.lock:
-                    self.clients[device_key] = None
-                    self.connected[device_key] = False
-                
-                self._update_connection_status(device_key, False)
-                future.set_exception(e)
-        
-        io_future.add_done_callback(on_done)
-        return future
+                result = False
+
+            # 接続状態を更新（切断に失敗してもリセットする）
+            with self.lock:
+                self.clients[device_key] = None
+                self.connected[device_key] = False
+                self._connected_mask &= ~DEVICE_BITS.get(device_key, 0)
+                self.characteristics[device_key] = None
+                self._last_sent_color.pop(device_key, None)
+
+            self._log(logging.INFO, f"{device_key}デバイスを切断しました")
+            self._update_connection_status(device_key, False)
+            return result
+
+        # IO専用スレッドで実行（run_coroutine_threadsafeのFutureをそのまま返す）
+        return self.io_thread.execute(disconnect_async())
 
     def enqueue_command(self, device_key, cmd_type, value, callback=None):
         """コマンドをキューに追加"""
+        # オーディオ連動モードの場合、色設定コマンドはキューに入れる前に捨てる
+        # （エンコード・投入・取り出しの往復を節約）
+        if self.audio_mode and cmd_type == CMD_COLOR:
+            return
+
         command = BLECommand(device_key, cmd_type, value, callback)
         self._log(logging.DEBUG, f"コマンドをキューに追加: {command}")
-        self.command_queue.put(command)
-        
-        # コマンドキュー処理が動いていなければ開始
-        if not self.queue_processing:
-            self.start_queue_processor()
+        self._cmd_deque.append(command)
+
+        # ドレインコルーチンが動いていなければIOループに1つだけ投入する
+        with self.lock:
+            if self._cmd_scheduled:
+                return
+            self._cmd_scheduled = True
+        asyncio.run_coroutine_threadsafe(
+            self._drain_command_queue(), self.io_thread.loop)
     
     def set_rgb_color(self, device_key, r, g, b, callback=None):
         """RGB値で色を設定"""
@@ -580,6 +655,33 @@ class BLEController(QObject):
             
             self._send_commands_simultaneously(commands, callback)
     
+    def _prepare_commands(self, commands):
+        """コマンドリストを送信可能な(device_key, client, payload)に変換する"""
+        prepared = []
+        for device_key, cmd_type, value in commands:
+            try:
+                # デバイス取得（dict読み取りはGILにより安全、切断直後の競合は
+                # 書き込み時の例外として処理される）
+                client = self.clients.get(device_key)
+                if not client or not self.connected.get(device_key, False):
+                    self._log(logging.WARNING, f"{device_key}デバイスは接続されていません")
+                    continue
+
+                # コマンドペイロードを生成
+                prepared.append((device_key, client, _encode_command(cmd_type, value)))
+
+                # このパス経由の色変更で最後に送った色のキャッシュは無効になる
+                if cmd_type in (CMD_COLOR, CMD_TRANSITION):
+                    self._last_sent_color.pop(device_key, None)
+
+                # 点灯を伴うコマンドなら消灯アイドル記録も解除する
+                self._mark_device_lit(device_key, cmd_type, value)
+
+            except Exception as e:
+                self._log(logging.ERROR, f"{device_key}デバイスのコマンド準備に失敗: {str(e)}")
+
+        return prepared
+
     def _send_commands_simultaneously(self, commands, callback=None):
         """複数のコマンドをできるだけ同時に送信"""
         if not commands:
@@ -600,36 +702,12 @@ class BLEController(QObject):
                 command_details.append(f"{device_key}:{cmd_type}:{value}")
         
         self._log(logging.DEBUG, f"一括コマンド送信の詳細: {', '.join(command_details)}")
-        
+
         # 同時実行するために全てのコマンドを先に準備
-        prepared_commands = []
-        command_strs = []
-        
-        for device_key, cmd_type, value in commands:
-            try:
-                # デバイス取得（スレッドセーフに）
-                with self.lock:
-                    client = self.clients.get(device_key)
-                    if not client or not self.connected.get(device_key, False):
-                        self._log(logging.WARNING, f"{device_key}デバイスは接続されていません")
-                        continue
-                
-                # コマンド文字列を生成
-                if cmd_type == CMD_COLOR:
-                    r, g, b = value
-                    command_str = f"{cmd_type}:{r},{g},{b}"
-                elif cmd_type == CMD_TRANSITION:
-                    r, g, b, duration = value
-                    command_str = f"{cmd_type}:{r},{g},{b},{duration}"
-                else:
-                    command_str = f"{cmd_type}:{value}"
-                
-                prepared_commands.append((device_key, client, command_str))
-                command_strs.append(f"{device_key}:{command_str}")
-                
-            except Exception as e:
-                self._log(logging.ERROR, f"{device_key}デバイスのコマンド準備に失敗: {str(e)}")
-        
+        prepared_commands = self._prepare_commands(commands)
+        command_strs = [f"{device_key}:{payload.decode('ascii')}"
+                        for device_key, _client, payload in prepared_commands]
+
         if not prepared_commands:
             if callback:
                 callback(False)
@@ -639,10 +717,16 @@ class BLEController(QObject):
         
         # 全てのコマンドを同時に送信するコルーチン
         async def send_all_commands():
+            # 単一デバイスの場合はタスク生成とgatherのオーバーヘッドを省略
+            if len(prepared_commands) == 1:
+                device_key, client, payload = prepared_commands[0]
+                result = await self._async_send_command(device_key, client, payload)
+                return isinstance(result, bool) and result
+
             tasks = []
-            for device_key, client, command_str in prepared_commands:
+            for device_key, client, payload in prepared_commands:
                 # 各デバイスごとにタスクを作成
-                task = asyncio.create_task(self._async_send_command(device_key, client, command_str))
+                task = asyncio.create_task(self._async_send_command(device_key, client, payload))
                 tasks.append(task)
             
             # 全てのタスクが完了するのを待機
@@ -667,14 +751,175 @@ class BLEController(QObject):
                     callback(False)
         
         future.add_done_callback(on_done)
-    
-    async def _async_send_command(self, device_key, client, command_str):
-        """単一コマンドを非同期で送信"""
+
+    def _send_commands_pipelined(self, command_batches, callback=None):
+        """複数のコマンドバッチを順序を保ったまま連続送信する
+
+        バッチ内のコマンドは同時送信し、バッチ間の順序は保証する
+        （例: 色設定→モード設定）。バッチ間にPython側のスリープは
+        挟まず、イベントループ上で連続して書き込む。
+        """
+        prepared_batches = [prepared for prepared in
+                            (self._prepare_commands(batch) for batch in command_batches)
+                            if prepared]
+
+        if not prepared_batches:
+            if callback:
+                callback(False)
+            return
+
+        # バッチを順番に送信するコルーチン
+        async def send_batches():
+            success = True
+            for prepared in prepared_batches:
+                if len(prepared) == 1:
+                    device_key, client, payload = prepared[0]
+                    result = await self._async_send_command(device_key, client, payload)
+                    success = success and isinstance(result, bool) and result
+                else:
+                    tasks = [asyncio.create_task(
+                        self._async_send_command(device_key, client, payload))
+                        for device_key, client, payload in prepared]
+                    results = await asyncio.gather(*tasks, return_exceptions=True)
+                    success = success and all(isinstance(r, bool) and r for r in results)
+            return success
+
+        # IO専用スレッドで一括実行
+        future = self.io_thread.execute(send_batches())
+
+        # 完了コールバック
+        def on_done(f):
+            try:
+                result = f.result()
+                if callback:
+                    callback(result)
+            except Exception as e:
+                self._log(logging.ERROR, f"バッチコマンド送信でエラーが発生: {str(e)}")
+                if callback:
+                    callback(False)
+
+        future.add_done_callback(on_done)
+
+    def send_raw_payloads(self, payloads, callback=None):
+        """エンコード済みコマンドペイロードをそのまま一括送信する
+
+        アニメーションのホットループ用。(device_key, bytes)のリストを受け取り、
+        毎フレームの文字列整形とエンコードを省略して書き込みのみを行う。
+        同じbytesオブジェクトを複数デバイスで共有してもよい。
+        """
+        # デバイス取得（dict読み取りはGILにより安全なのでロック不要）
+        prepared = []
+        for device_key, payload in payloads:
+            client = self.clients.get(device_key)
+            if client and self.connected.get(device_key, False):
+                prepared.append((device_key, client, payload))
+                # 生ペイロードの書き込みで色のキャッシュは無効になる
+                # （内容は判定しないため消灯アイドル記録も常に解除する）
+                self._last_sent_color.pop(device_key, None)
+                self.device_idle[device_key] = False
+
+        if not prepared:
+            if callback:
+                callback(False)
+            return
+
+        # 全てのペイロードを同時に送信するコルーチン
+        async def send_all_payloads():
+            # 単一デバイスの場合はタスク生成とgatherのオーバーヘッドを省略
+            if len(prepared) == 1:
+                device_key, client, payload = prepared[0]
+                return await self._async_send_payload(device_key, client, payload)
+
+            tasks = []
+            for device_key, client, payload in prepared:
+                tasks.append(asyncio.create_task(
+                    self._async_send_payload(device_key, client, payload)))
+
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            return all(isinstance(r, bool) and r for r in results)
+
+        # IO専用スレッドで一括実行
+        future = self.io_thread.execute(send_all_payloads())
+
+        if callback:
+            def on_done(f):
+                try:
+                    callback(f.result())
+                except Exception as e:
+                    self._log(logging.ERROR, f"一括ペイロード送信でエラーが発生: {str(e)}")
+                    callback(False)
+
+            future.add_done_callback(on_done)
+
+    def queue_latest_payload(self, device_key, payload):
+        """最新のペイロードだけを保持して送信する（未送信の古い分は上書き）
+
+        スライダー操作や点滅アニメーションのように生成側が無線より速く
+        コマンドを出す場合に、未送信コマンドを積み上げず常に最新状態だけを
+        書き込むためのlatest-wins送信パス。
+        """
+        loop = self.io_thread.loop
+
+        def _put():
+            # デバイスごとの送信ワーカーを初回利用時に起動
+            if device_key not in self._payload_events:
+                self._payload_events[device_key] = asyncio.Event()
+                loop.create_task(self._payload_writer(device_key))
+
+            self._pending_payloads[device_key] = payload
+            self._payload_events[device_key].set()
+            # latest-wins経由の書き込みで色のキャッシュは無効になる
+            # （内容は判定しないため消灯アイドル記録も常に解除する）
+            self._last_sent_color.pop(device_key, None)
+            self.device_idle[device_key] = False
+
+        loop.call_soon_threadsafe(_put)
+
+    async def _payload_writer(self, device_key):
+        """デバイスごとの送信ワーカー。保留スロットの最新ペイロードのみを書き込む"""
+        event = self._payload_events[device_key]
+        while True:
+            await event.wait()
+            event.clear()
+
+            payload = self._pending_payloads[device_key]
+            self._pending_payloads[device_key] = None
+            if payload is None:
+                continue
+
+            # デバイス取得（IOループ上で動くワーカーなのでロック不要）
+            client = self.clients.get(device_key)
+            if not client or not self.connected.get(device_key, False):
+                continue
+
+            await self._async_send_payload(device_key, client, payload)
+
+    async def _async_send_payload(self, device_key, client, payload):
+        """エンコード済みペイロードを非同期で送信"""
+        try:
+            char = self.characteristics.get(device_key) or CHARACTERISTIC_UUID
+            await client.write_gatt_char(char, payload, response=False)
+            return True
+        except Exception as e:
+            self._log(logging.ERROR, f"{device_key}デバイスへのコマンド送信エラー: {str(e)}")
+            return False
+
+    async def _async_send_command(self, device_key, client, payload):
+        """単一コマンドのエンコード済みペイロードを非同期で送信"""
         try:
-            self._log(logging.DEBUG, f"{device_key}デバイスにコマンド送信開始: {command_str}")
-            await client.write_gatt_char(CHARACTERISTIC_UUID, command_str.encode())
-            self._log(logging.DEBUG, f"{device_key}デバイスにコマンド送信完了: {command_str}")
+            self._log(logging.DEBUG, f"{device_key}デバイスにコマンド送信開始: {payload}")
+            # Write Without Responseで送信（ACK待ちで次のデバイスへの書き込みをブロックしない）
+            # タイムアウト時はループ上で書き込みをキャンセルして放置させない
+            char = self.characteristics.get(device_key) or CHARACTERISTIC_UUID
+            await asyncio.wait_for(
+                client.write_gatt_char(char, payload, response=False),
+                timeout=self.command_timeout)
+            self._log(logging.DEBUG, f"{device_key}デバイスにコマンド送信完了: {payload}")
             return True
+        except asyncio.TimeoutError:
+            self._log(logging.ERROR, f"{device_key}デバイスへのコマンド送信がタイムアウトしました")
+            self._update_connection_status(device_key, False)
+            return False
         except Exception as e:
             self._log(logging.ERROR, f"{device_key}デバイスへのコマンド送信エラー: {str(e)}")
             return False
@@ -689,46 +934,33 @@ class BLEController(QObject):
 
     def check_connection(self, device_key):
         """デバイスの接続状態をチェック"""
-        future = concurrent.futures.Future()
-        
-        with self.lock:
-            client = self.clients.get(device_key)
-            if not client:
-                self._log(logging.DEBUG, f"{device_key}デバイスのクライアントが存在しません")
-                self._update_connection_status(device_key, False)
-                future.set_result(False)
-                return future
-        
+        client = self.clients.get(device_key)
+        if not client:
+            self._log(logging.DEBUG, f"{device_key}デバイスのクライアントが存在しません")
+            self._update_connection_status(device_key, False)
+            future = concurrent.futures.Future()
+            future.set_result(False)
+            return future
+
         # 接続状態確認処理
         async def check_connection_async():
             try:
+                result = False
                 if client.is_connected:
                     # services プロパティを使用して警告を回避
                     services = client.services
                     if services:
-                        return True
-                return False
+                        result = True
             except Exception as e:
                 self._log(logging.DEBUG, f"{device_key}デバイス接続確認中にエラー: {str(e)}")
-                return False
-        
-        # IO専用スレッドで実行
-        io_future = self.io_thread.execute(check_connection_async())
-        
-        # 完了コールバック
-        def on_done(f):
-            try:
-                result = f.result()
-                # 接続状態を更新
-                self._update_connection_status(device_key, result)
-                future.set_result(result)
-            except Exception as e:
-                self._log(logging.ERROR, f"{device_key}デバイスの接続確認でエラー: {str(e)}")
-                self._update_connection_status(device_key, False)
-                future.set_exception(e)
-        
-        io_future.add_done_callback(on_done)
-        return future
+                result = False
+
+            # 接続状態を更新
+            self._update_connection_status(device_key, result)
+            return result
+
+        # IO専用スレッドで実行（run_coroutine_threadsafeのFutureをそのまま返す）
+        return self.io_thread.execute(check_connection_async())
     
     def check_all_connections(self):
         """全デバイスの接続状態をチェック"""
@@ -758,49 +990,41 @@ class BLEController(QObject):
         """オーディオ処理からの色更新"""
         if not self.audio_mode:
             return
-            
-        # 接続済みのデバイスを確認
-        connected_devices = []
-        for device_key in ["LEFT", "RIGHT"]:
+
+        # 遷移コマンドのペイロードを1回だけ生成し、同じbytesを両デバイスで共有
+        payload = b"T:%d,%d,%d,%d" % (
+            color.red(), color.green(), color.blue(), self.audio_transition_time)
+
+        # latest-wins送信パス経由で送る。音声の生成レートがBLEの書き込み
+        # レートを上回っても未送信の古い色は上書きされ、遅延が積み上がらない
+        for device_key in ("LEFT", "RIGHT"):
             if self.connected.get(device_key, False):
-                connected_devices.append(device_key)
-        
-        if not connected_devices:
-            return
-            
-        # 全デバイスに同時に色を送信（遷移コマンドを使用）
-        commands = []
-        r, g, b = color.red(), color.green(), color.blue()
-        
-        for device_key in connected_devices:
-            commands.append((device_key, CMD_TRANSITION, (r, g, b, self.audio_transition_time)))
-        
-        # コールバックなしで送信（軽量処理）
-        self._send_commands_simultaneously(commands)
+                self.queue_latest_payload(device_key, payload)
 
 class ColorPreviewWidget(QWidget):
     """色のプレビューを表示するウィジェット"""
     def __init__(self, parent=None):
         super().__init__(parent)
         self.color = QColor(255, 255, 255)
+        self._brush = QBrush(self.color)
         self.setMinimumSize(100, 50)
-        
+
     def setColor(self, color):
         self.color = color
+        self._brush.setColor(color)
         self.update()
-        
+
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setBrush(QBrush(self.color))
+        painter.setBrush(self._brush)
         painter.drawRect(0, 0, self.width(), self.height())
 
 class AudioProcessor(QObject):
     """音声信号を処理してLED色情報に変換するクラス"""
     
-    # 色更新シグナル
-    color_changed = Signal(QColor)
-    audio_level = Signal(float)  # 0.0-1.0 のレベル
-    
+    # 色とレベルの更新シグナル（クロススレッドemitをフレームあたり1回に統合）
+    audio_update = Signal(QColor, float)  # 色, 0.0-1.0 のレベル
+
     def __init__(self):
         super().__init__()
         
@@ -818,11 +1042,8 @@ class AudioProcessor(QObject):
         self.stream = None
         self.running = False
         self.thread = None
-        self.lock = Lock()
-        
-        # FFT解析用のバッファ
-        self.fft_buffer = deque(maxlen=8)  # バッファサイズを増やす
-        
+
+
         # パラメータ設定を調整 - 感度を上げてスムージングを減らす
         self.sensitivity = 0.85      # 感度を大幅に上げる（0.65→0.85）
         self.smoothing = 0.65        # スムージングを減らす（0.85→0.65）
@@ -836,15 +1057,15 @@ class AudioProcessor(QObject):
         self.value_max = 1.0          # 最大明度
         self.value_boost = 1.7        # 明度のブースト係数を上げる（1.4→1.7）
         
-        # FFTバッファサイズを調整
-        self.fft_buffer = deque(maxlen=6)  # バッファサイズを減らして反応速度を上げる（12→6）
-        
         # 色相範囲の設定（0-1の範囲）
         self.hue_range = (0.0, 1.0)  # 全色相を使用
         
-        # 移動平均用のバッファサイズを減らす
-        self.hue_buffer_size = 4     # より速い色相の変化（8→4）
-        self.value_buffer_size = 4    # より速い明度の変化（8→4）
+        # 色相・明度の平滑化係数（1次IIR。旧maxlen=4のdeque移動平均と同程度の特性）
+        self.hue_ema_alpha = 0.4
+        self.value_ema_alpha = 0.4
+
+        # 無音判定の振幅閾値（int16。これ以下のフレームはFFTをスキップ）
+        self.silence_threshold = 200
         
         # バンドごとの重み付け調整 - ベースと高音をより強調
         self.band_weights = {
@@ -871,6 +1092,7 @@ class AudioProcessor(QObject):
         # 音声反応の更新間隔調整 (ミリ秒)
         self.update_interval = 100  # 更新間隔を短くする（150→100ms）
         self.last_update_time = 0
+        self._last_emit_rgb = (-1, -1, -1)  # 最後に通知した色（同一色の連発を抑制）
         
         # ピーク検出用のパラメータ
         self.peak_detection = True   # ピーク検出を有効化
@@ -912,8 +1134,7 @@ class AudioProcessor(QObject):
                 rate=self.RATE,
                 input=True,
                 input_device_index=default_input['index'],
-                frames_per_buffer=self.CHUNK,
-                stream_callback=self._audio_callback
+                frames_per_buffer=self.CHUNK
             )
             
             self.running = True
@@ -945,20 +1166,6 @@ class AudioProcessor(QObject):
             self.thread.join(timeout=1.0)
             self.thread = None
     
-    def _audio_callback(self, in_data, frame_count, time_info, status):
-        """オーディオコールバック（別スレッドで呼ばれる）"""
-        if status:  # エラー状態をチェック
-            self.logger.warning(f"オーディオコールバックでエラー: {status}")
-            return (None, pyaudio.paAbort)
-            
-        with self.lock:
-            # バッファにデータを追加
-            if self.running:
-                self.fft_buffer.append(in_data)
-        
-        # 処理を続行
-        return (None, pyaudio.paContinue)
-    
     def _processing_thread(self):
         """オーディオデータを処理するスレッド"""
         
@@ -972,60 +1179,86 @@ class AudioProcessor(QObject):
             "high": (4000, 12000)    # 高音
         }
         
-        # 移動平均用のバッファ（サイズを小さくして反応速度アップ）
-        hue_buffer = deque([0.0] * self.hue_buffer_size, maxlen=self.hue_buffer_size)
-        value_buffer = deque([0.0] * self.value_buffer_size, maxlen=self.value_buffer_size)
-        
+        # 色相・明度の平滑化状態（deque+np.meanの移動平均を1積和のEMAに置き換え）
+        hue_ema = 0.0
+        value_ema = 0.0
+
+        # FFT用の事前計算・作業バッファ（チャンク長とレートは固定なので毎フレーム作り直さない）
+        freq_bins = np.fft.rfftfreq(self.CHUNK, 1.0 / self.RATE)
+        samples = np.zeros(self.CHUNK)
+        fft_data = np.zeros(self.CHUNK // 2 + 1)
+
+        # 各バンドのビン範囲と係数（重み×ブースト）を事前計算
+        # バンドは連続した周波数帯なので開始インデックスの列でreduceatできる
+        band_starts = np.searchsorted(freq_bins, [low for low, _ in bands.values()], side="left")
+        band_end = np.searchsorted(freq_bins, bands["high"][1], side="right")
+        band_counts = np.diff(np.append(band_starts, band_end))
+        band_boosts = np.array([
+            self.bass_boost if name in ("sub_bass", "bass")
+            else self.treble_boost if name in ("high_mid", "high")
+            else 1.0
+            for name in bands
+        ])
+        band_coeffs = np.array([self.band_weights.get(name, 1.0) for name in bands]) * band_boosts
+
+        # 毎フレーム参照するパラメータはローカル変数に取り出しておく
+        # （属性参照はローカル読み出しより大幅に遅く、このループは常駐する）
+        power_scale = self.power_scale
+        hue_min, hue_max = self.hue_range
+        sensitivity = self.sensitivity
+        saturation_min = self.saturation_min
+        value_min = self.value_min
+        value_max = self.value_max
+        value_boost = self.value_boost
+        hue_alpha = self.hue_ema_alpha
+        value_alpha = self.value_ema_alpha
+        color_smoothing = self.color_smoothing
+        inv_color_smoothing = 1.0 - color_smoothing
+        smoothing = self.smoothing
+        inv_smoothing = 1.0 - smoothing
+        silence_threshold = self.silence_threshold
+        was_silent = False
+
         while self.running:
             try:
-                # データ取得とFFT処理
-                with self.lock:
-                    if not self.fft_buffer:
-                        time.sleep(0.01)
-                        continue
-                    
-                    # 最新のデータを取得
-                    data = self.fft_buffer.pop()
-                
-                # バイトデータを整数に変換
-                count = len(data) // 2
-                format = f"{count}h"
-                samples = struct.unpack(format, data)
-                
-                # 正規化（-1.0 から 1.0 の範囲に）
-                samples = np.array(samples) / 32768.0
-                
-                # FFT処理
-                fft_data = np.abs(np.fft.rfft(samples))
-                
-                # 周波数ビンのインデックス計算
-                freq_bins = np.fft.rfftfreq(len(samples), 1.0/self.RATE)
-                
-                # 各周波数帯の強度を計算（よりスムーズに）
-                band_levels = {}
-                for band_name, (low_freq, high_freq) in bands.items():
-                    # 該当する周波数範囲のインデックスを取得
-                    band_indices = np.where((freq_bins >= low_freq) & (freq_bins <= high_freq))[0]
-                    
-                    # この帯域の平均振幅を計算
-                    if len(band_indices) > 0:
-                        # パワースペクトルの計算を改善
-                        band_power = np.mean(np.power(fft_data[band_indices], self.power_scale))
-                        
-                        # 重み付けとブースト処理
-                        weight = self.band_weights.get(band_name, 1.0)
-                        if band_name in ["sub_bass", "bass"]:
-                            band_power *= self.bass_boost
-                        elif band_name in ["high_mid", "high"]:
-                            band_power *= self.treble_boost
-                            
-                        band_levels[band_name] = band_power * weight
-                    else:
-                        band_levels[band_name] = 0.0
-                
+                # ブロッキング読み取り（CHUNK分たまるまで待つ＝ループの自然なペース制御）
+                stream = self.stream
+                if stream is None:
+                    break
+                data = stream.read(self.CHUNK, exception_on_overflow=False)
+                if len(data) != self.CHUNK * 2:
+                    continue
+
+                raw = np.frombuffer(data, dtype=np.int16)
+
+                # ノイズフロア以下の無音フレームはFFT以降を丸ごとスキップ
+                if raw.max() < silence_threshold and raw.min() > -silence_threshold:
+                    if not was_silent:
+                        was_silent = True
+                        # 無音に落ちた最初のフレームだけ最小明度の色を通知
+                        self.prev_value = value_min
+                        color = QColor.fromHsvF(
+                            self.prev_hue, self.prev_saturation, value_min)
+                        self._last_emit_rgb = (color.red(), color.green(), color.blue())
+                        self.audio_update.emit(color, value_min)
+                    continue
+                was_silent = False
+
+                # 正規化（-1.0 から 1.0 の範囲に、作業バッファへ直接書き込み）
+                np.multiply(raw, 1.0 / 32768.0, out=samples)
+
+                # FFT処理（実数FFT、振幅は事前確保バッファへ）
+                np.abs(np.fft.rfft(samples), out=fft_data)
+
+                # 各周波数帯の平均パワーをまとめて計算
+                # （powerを対象ビン全体に一括適用→reduceatで帯域ごとに集計）
+                powered = np.power(fft_data[:band_end], power_scale)
+                band_levels = np.add.reduceat(powered, band_starts) / band_counts * band_coeffs
+                sub_bass, bass, low_mid, mid, high_mid, high = band_levels
+
                 # 低音と高音のバランスで色相を計算
-                bass_energy = (band_levels["sub_bass"] * 2.0 + band_levels["bass"]) / 3.0
-                treble_energy = (band_levels["high_mid"] + band_levels["high"]) / 2.0
+                bass_energy = (sub_bass * 2.0 + bass) / 3.0
+                treble_energy = (high_mid + high) / 2.0
                 
                 # 色相の計算
                 target_hue = 0.0
@@ -1035,24 +1268,21 @@ class AudioProcessor(QObject):
                     if total_energy > 0:
                         balance = bass_energy / total_energy
                         # 色相範囲のマッピング (低音が強いほど赤系、高音が強いほど青系)
-                        hue_min, hue_max = self.hue_range
                         target_hue = hue_min + (hue_max - hue_min) * (1.0 - balance)
                 
-                # 色相の移動平均を計算
-                hue_buffer.append(target_hue)
-                smoothed_hue = np.mean(hue_buffer)
+                # 色相の平滑化（EMA）
+                hue_ema += hue_alpha * (target_hue - hue_ema)
+                smoothed_hue = hue_ema
                 
                 # 中音のエネルギーで彩度を決定
-                mid_energy = (band_levels["low_mid"] + band_levels["mid"] + band_levels["high_mid"]) / 3.0
+                mid_energy = (low_mid + mid + high_mid) / 3.0
                 target_saturation = max(
-                    self.saturation_min,
-                    min(1.0, mid_energy * 2.5 * self.sensitivity)  # 彩度の感度を上げる（2.0→2.5）
+                    saturation_min,
+                    min(1.0, mid_energy * 2.5 * sensitivity)  # 彩度の感度を上げる（2.0→2.5）
                 )
                 
                 # 全体的な強度で明度を決定
-                overall_level = np.mean([
-                    band_levels[band] for band in bands.keys()
-                ])
+                overall_level = band_levels.mean()
                 
                 # ピーク検出のための音量履歴を更新
                 self.level_history.append(overall_level)
@@ -1088,18 +1318,18 @@ class AudioProcessor(QObject):
                 
                 # 明度の計算（範囲を広げる）
                 base_value = max(
-                    self.value_min,
-                    min(self.value_max, overall_level * self.sensitivity * self.value_boost)
+                    value_min,
+                    min(value_max, overall_level * sensitivity * value_boost)
                 )
                 
-                # 明度の移動平均を計算（バッファサイズを減らして反応を早く）
-                value_buffer.append(base_value)
-                smoothed_value = np.mean(value_buffer)
+                # 明度の平滑化（EMA）
+                value_ema += value_alpha * (base_value - value_ema)
+                smoothed_value = value_ema
                 
                 # スムージング処理（スムージングを減らしてより直接的な反応に）
-                hue = smoothed_hue * (1.0 - self.color_smoothing) + self.prev_hue * self.color_smoothing
-                saturation = target_saturation * (1.0 - self.color_smoothing) + self.prev_saturation * self.color_smoothing
-                value = smoothed_value * (1.0 - self.smoothing) + self.prev_value * self.smoothing
+                hue = smoothed_hue * inv_color_smoothing + self.prev_hue * color_smoothing
+                saturation = target_saturation * inv_color_smoothing + self.prev_saturation * color_smoothing
+                value = smoothed_value * inv_smoothing + self.prev_value * smoothing
                 
                 # 前回の値を更新
                 self.prev_hue = hue
@@ -1107,25 +1337,22 @@ class AudioProcessor(QObject):
                 self.prev_value = value
                 self.prev_level = overall_level
                 
-                # HSVからRGBに変換
-                r, g, b = colorsys.hsv_to_rgb(hue, saturation, value)
-                
-                # QColorに変換して発信
-                color = QColor(
-                    int(r * 255), 
-                    int(g * 255), 
-                    int(b * 255)
-                )
-                
-                # 更新間隔を制限して信号発信
+                # HSVから直接QColorを生成（Qt側のC実装で変換）
+                color = QColor.fromHsvF(hue, saturation, value)
+
+                # 更新間隔と色差で信号発信を間引く
+                # （無音時のほぼ同一色でGUI/BLEスレッドを起こさない）
                 if current_time - self.last_update_time >= self.update_interval or peak_detected:
-                    self.color_changed.emit(color)
-                    self.audio_level.emit(smoothed_value)
-                    self.last_update_time = current_time
-                
-                # フレームレートを調整（より高いフレームレートで応答性を向上）
-                time.sleep(0.03)  # 約33FPSに調整（0.04→0.03）
+                    r, g, b = color.red(), color.green(), color.blue()
+                    last_r, last_g, last_b = self._last_emit_rgb
+                    if (peak_detected or abs(r - last_r) > 4
+                            or abs(g - last_g) > 4 or abs(b - last_b) > 4):
+                        self._last_emit_rgb = (r, g, b)
+                        self.audio_update.emit(color, smoothed_value)
+                        self.last_update_time = current_time
                 
+                # ループのペースはブロッキング読み取り（CHUNK/RATE ≒ 23ms）が決める
+
             except Exception as e:
                 logging.error(f"オーディオ処理中にエラー: {str(e)}")
                 time.sleep(0.1)  # エラー時は少し待機
@@ -1181,7 +1408,7 @@ class MainWindow(QMainWindow):
         
         # オーディオプロセッサの初期化
         self.audio_processor = AudioProcessor()
-        self.audio_processor.color_changed.connect(self.update_audio_color)
+        self.audio_processor.audio_update.connect(self.update_audio_color)
         
         # BLEコントローラーの初期化
         self.ble_controller = BLEController()
@@ -1744,8 +1971,7 @@ class MainWindow(QMainWindow):
     def start_animation(self, animation_type):
         """指定されたアニメーションを開始する"""
         # 接続状態の確認
-        if not (self.ble_controller.connected.get("LEFT", False) or 
-                self.ble_controller.connected.get("RIGHT", False)):
+        if not self.ble_controller.is_any_connected():
             self.logger.warning("デバイスが接続されていません。アニメーションを開始できません。")
             QMessageBox.warning(self, "接続エラー", "少なくとも一つのデバイスを接続してください。")
             return
@@ -1964,28 +2190,19 @@ class MainWindow(QMainWindow):
         btn.setEnabled(True)
         
         # 両方に適用ボタンの状態を更新
-        self.apply_both_btn.setEnabled(
-            self.ble_controller.connected.get("LEFT", False) and 
-            self.ble_controller.connected.get("RIGHT", False)
-        )
-        
+        self.apply_both_btn.setEnabled(self.ble_controller.are_both_connected())
+
         # 遷移ボタンの状態も更新
         if device_key == "LEFT":
             self.transition_left_btn.setEnabled(connected)
         else:  # RIGHT
             self.transition_right_btn.setEnabled(connected)
-        
+
         # 両方に遷移ボタンの状態を更新
-        self.transition_both_btn.setEnabled(
-            self.ble_controller.connected.get("LEFT", False) and 
-            self.ble_controller.connected.get("RIGHT", False)
-        )
-        
+        self.transition_both_btn.setEnabled(self.ble_controller.are_both_connected())
+
         # アニメーション実行中の場合は停止
-        if self.led_animation.running and not (
-            self.ble_controller.connected.get("LEFT", False) or 
-            self.ble_controller.connected.get("RIGHT", False)
-        ):
+        if self.led_animation.running and not self.ble_controller.is_any_connected():
             self.stop_animation()
 
     # その他の既存メソッド
@@ -2016,39 +2233,8 @@ class MainWindow(QMainWindow):
         self.current_hue = value
         self.hue_value_label.setText(str(value))
         
-        # 色相に基づいてプレビューの色を更新（HSVからRGB変換）
-        h = value / 255.0
-        s = 1.0
-        v = 1.0
-        
-        if s == 0.0:
-            r = g = b = v
-        else:
-            h *= 6.0
-            i = int(h)
-            f = h - i
-            p = v * (1.0 - s)
-            q = v * (1.0 - s * f)
-            t = v * (1.0 - s * (1.0 - f))
-            
-            if i == 0:
-                r, g, b = v, t, p
-            elif i == 1:
-                r, g, b = q, v, p
-            elif i == 2:
-                r, g, b = p, v, t
-            elif i == 3:
-                r, g, b = p, q, v
-            elif i == 4:
-                r, g, b = t, p, v
-            else:
-                r, g, b = v, p, q
-        
-        self.current_color = QColor(
-            int(r * 255),
-            int(g * 255),
-            int(b * 255)
-        )
+        # 色相に基づいてプレビューの色を更新（HSVからRGB変換はQt側のC実装）
+        self.current_color = QColor.fromHsvF(value / 255.0, 1.0, 1.0)
         self.color_preview.setColor(self.current_color)
     
     def on_mode_changed(self):
@@ -2097,15 +2283,15 @@ class MainWindow(QMainWindow):
                     "音楽連動" if self.audio_mode_radio.isChecked() else "不明"
         self.logger.info(f"モードを変更: {mode_name}")
     
-    def update_audio_color(self, color):
-        """オーディオ処理からの色更新を受け取る"""
+    def update_audio_color(self, color, level):
+        """オーディオ処理からの色・レベル更新を受け取る"""
         if not self.audio_mode:
             return
-            
+
         # プレビューの色を更新
         self.current_color = color
         self.color_preview.setColor(color)
-        
+
         # BLEコントローラーに色を送信
         self.ble_controller.update_audio_color(color)
     
@@ -2204,7 +2390,7 @@ class MainWindow(QMainWindow):
     
     def apply_to_both(self):
         """両方のデバイスに設定を適用"""
-        if not (self.ble_controller.connected.get("LEFT", False) and self.ble_controller.connected.get("RIGHT", False)):
+        if not self.ble_controller.are_both_connected():
             self.logger.warning("両方のデバイスが接続されていません")
             return
         
@@ -2238,10 +2424,7 @@ class MainWindow(QMainWindow):
         
         # 設定適用
         def on_both_complete(success):
-            self.apply_both_btn.setEnabled(
-                self.ble_controller.connected.get("LEFT", False) and 
-                self.ble_controller.connected.get("RIGHT", False)
-            )
+            self.apply_both_btn.setEnabled(self.ble_controller.are_both_connected())
             self.progress_bar.setVisible(False)
             
             if success:
@@ -2301,7 +2484,7 @@ class MainWindow(QMainWindow):
     
     def apply_transition_to_both(self):
         """両方のデバイスに遷移設定を適用"""
-        if not (self.ble_controller.connected.get("LEFT", False) and self.ble_controller.connected.get("RIGHT", False)):
+        if not self.ble_controller.are_both_connected():
             self.logger.warning("両方のデバイスが接続されていません")
             return
         
@@ -2340,10 +2523,7 @@ class MainWindow(QMainWindow):
         
         # 設定適用
         def on_both_complete(success):
-            self.transition_both_btn.setEnabled(
-                self.ble_controller.connected.get("LEFT", False) and 
-                self.ble_controller.connected.get("RIGHT", False)
-            )
+            self.transition_both_btn.setEnabled(self.ble_controller.are_both_connected())
             self.progress_bar.setVisible(False)
             
             if success:
@@ -2368,19 +2548,17 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'audio_processor'):
             self.audio_processor.cleanup()
         
-        # リソース解放
-        self.ble_controller.cleanup()
-        
-        # 各デバイスの切断処理
+        # 各デバイスの切断処理（fire-and-forget。ペリフェラルが圏外でも終了をブロックしない）
         for device_key in ["LEFT", "RIGHT"]:
             if self.ble_controller.connected.get(device_key, False):
                 try:
-                    future = self.ble_controller.disconnect(device_key)
-                    # 切断処理が完了するのを少し待つ
-                    future.result(timeout=1.0)
+                    self.ble_controller.disconnect(device_key)
                 except:
                     pass
-        
+
+        # リソース解放（IOスレッドの停止時に投入済みの切断処理を短時間だけ待つ）
+        self.ble_controller.cleanup()
+
         event.accept()
 
     def update_audio_interval(self, value):
@@ -2424,17 +2602,12 @@ class MainWindow(QMainWindow):
         
         self.logger.info("両方のデバイスの接続を開始します")
         
-        # 未接続のデバイスを接続
-        connect_tasks = []
-        
-        if not left_connected:
-            left_future = self.ble_controller.scan_and_connect("LEFT")
-            connect_tasks.append(left_future)
-        
-        if not right_connected:
-            right_future = self.ble_controller.scan_and_connect("RIGHT")
-            connect_tasks.append(right_future)
-        
+        # 未接続のデバイスを1回のスキャンでまとめて接続
+        pending_keys = [key for key, connected in
+                        (("LEFT", left_connected), ("RIGHT", right_connected))
+                        if not connected]
+        future = self.ble_controller.connect_both(pending_keys)
+
         # 接続完了時の処理
         def on_all_connect_done():
             self.both_connect_btn.setEnabled(True)
@@ -2457,22 +2630,8 @@ class MainWindow(QMainWindow):
             else:
                 self.logger.error("両方のデバイスの接続に失敗しました")
         
-        # すべてのタスクが完了したら通知
-        pending_count = len(connect_tasks)
-        
-        def on_connect_done(future):
-            nonlocal pending_count
-            pending_count -= 1
-            if pending_count <= 0:
-                on_all_connect_done()
-        
-        # コールバックを設定
-        for future in connect_tasks:
-            future.add_done_callback(on_connect_done)
-        
-        # タスクがない場合（既に両方接続されている場合など）
-        if not connect_tasks:
-            on_all_connect_done()
+        # 完了コールバックを設定
+        future.add_done_callback(lambda _f: on_all_connect_done())
 
     def reset_animation_buttons(self):
         """全てのアニメーションボタンのスタイルをリセット"""
@@ -168,6 +168,7 @@ void setup() {
                       CHARACTERISTIC_UUID,
                       BLECharacteristic::PROPERTY_READ |
                       BLECharacteristic::PROPERTY_WRITE |
+                      BLECharacteristic::PROPERTY_WRITE_NR |  // 応答なし書き込み（PC側はresponse=Falseで送信）
                       BLECharacteristic::PROPERTY_NOTIFY
                     );
   
@@ -177,6 +178,7 @@ void setup() {
   pService->start();
   
   BLEAdvertising *pAdvertising = pServer->getAdvertising();
+  pAdvertising->addServiceUUID(SERVICE_UUID);  // PC側のservice_uuidsフィルタ付きスキャンで発見できるようにする
   pAdvertising->start();
   Serial.println("BLEサーバーが起動しました");
 }